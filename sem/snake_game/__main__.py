@@ -1,8 +1,164 @@
-"""Import"""
-from src.game import Game
+"""Imports"""
+import argparse
+import os
+import sys
 
-game = Game()
+# game modules (and pygame with NumPy they need) are imported only once it's clear what is going to run,
+# so the imports inside the functions below are deliberate
+# without this pygame prints its banner on import (workers inherit the environment, so they are quiet as well)
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
 
-# main game loop
-while True:
-    game.update()
+
+def parse_args(argv=None):
+    """Parses command line arguments (of the process by default)"""
+    parser = argparse.ArgumentParser(prog="snake_game", description="Snake against AI")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="game speed multiplier, 0 to simulate as fast as possible")
+    parser.add_argument("--replay", default=None, help="save replay of every finished match, numbered before the extension of this file")
+    parser.add_argument("--profile", default=None, metavar="FILE",
+                        help="show profiler overlay and dump its data to a .csv or .json file")
+    parser.add_argument("--ai", choices=("greedy", "lookahead"), default="greedy",
+                        help="AI of the enemy snake, lookahead searches ahead within a time budget per move")
+    parser.add_argument("--grid-size", type=int, default=None, help="number of tiles of the board")
+    commands = parser.add_subparsers(dest="command")
+
+    tournament = commands.add_parser("tournament", help="play many AI vs AI matches")
+    tournament.add_argument("--games", type=int, default=1000, help="number of matches")
+    tournament.add_argument("--workers", type=int, default=None,
+                            help="number of worker processes (default: number of cores)")
+    tournament.add_argument("--seed", type=int, default=0, help="seed of the whole tournament")
+    # options given also before the command are suppressed here, so that the subcommand doesn't override them
+    tournament.add_argument("--grid-size", type=int, nargs="+", default=argparse.SUPPRESS,
+                            help="number of tiles of the board, matches take turns in using several sizes")
+    tournament.add_argument("--ai", nargs="+", choices=("greedy", "lookahead"), default=argparse.SUPPRESS,
+                            help="AI of the enemy snake, matches take turns in using several AIs to compare them")
+    tournament.add_argument("--max-ticks", type=int, default=100000,
+                            help="matches longer than this end in a draw")
+    tournament.add_argument("--out", default="results.jsonl", help="file for results of the matches")
+    tournament.add_argument("--frames", default=None, metavar="DIR",
+                            help="record every tick of the matches as frames into this directory")
+    tournament.add_argument("--frame-format", choices=("raw", "ppm"), default="raw",
+                            help="raw RGB24 stream per match, or a directory of PPM images per match")
+    tournament.add_argument("--frame-scale", type=int, default=8, help="pixels per tile of the frames")
+
+    serve = commands.add_parser("serve", help="host matches for remote players over TCP")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=5555, help="port to listen on")
+    serve.add_argument("--tick-ms", type=float, default=None,
+                       help="length of one tick in milliseconds (default: move interval of the game)")
+    serve.add_argument("--seed", type=int, default=None, help="seed of the matches")
+    serve.add_argument("--grid-size", type=int, default=argparse.SUPPRESS, help="number of tiles of the board")
+
+    bench = commands.add_parser("bench", help="measure performance of the hot paths and compare it with a baseline")
+    bench.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    bench.add_argument("--out", default=None, help="file for results (JSON)")
+    bench.add_argument("--baseline", default=BASELINE_PATH, help="results to compare with")
+    bench.add_argument("--tolerance", type=float, default=None,
+                       help="allowed slowdown against the baseline (0.5 means 50 %%)")
+    bench.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    args = parser.parse_args(argv)
+    if args.ai == "lookahead" and args.replay:
+        # depth of the search depends on time, so the enemy could play differently when replayed
+        parser.error("replays can be recorded only with the greedy AI")
+    return args
+
+
+def run_bench(args):
+    """Runs benchmarks, returns exit code 1 if some of them got slower than the baseline"""
+    from src import benchmark  # pylint: disable=import-outside-toplevel
+
+    results = benchmark.run_benchmarks(args.names)
+    for name, seconds in results.items():
+        print(f"{name:40} {seconds * 1e6:12.2f} us")
+    if args.out:
+        benchmark.save_results(results, args.out)
+    if args.save_baseline:
+        benchmark.save_results(results, args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline in {args.baseline}")
+        return 0
+
+    tolerance = benchmark.DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance
+    regressions = benchmark.compare(results, benchmark.load_results(args.baseline), tolerance)
+    for name, ratio in regressions.items():
+        print(f"REGRESSION {name}: {ratio:.2f}x slower than the baseline")
+    return 1 if regressions else 0
+
+
+async def run_server(args):
+    """Runs the game server until it's interrupted"""
+    import src.config as conf  # pylint: disable=import-outside-toplevel
+    from src.server import GameServer  # pylint: disable=import-outside-toplevel
+
+    server = GameServer((args.tick_ms or conf.MOVE_INTERVAL) / 1000, seed=args.seed,
+                        config=conf.board_config(args.grid_size or conf.GRID_SIZE))
+    port = await server.start(args.host, args.port)
+    print(f"Serving on {args.host}:{port}")
+    try:
+        await server.run()
+    finally:
+        await server.close()
+
+
+def main():
+    """Runs the interactive game or one of the tools"""
+    args = parse_args()
+
+    if args.command == "bench":
+        sys.exit(run_bench(args))
+
+    if args.command == "serve":
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        asyncio.run(run_server(args))
+        return
+
+    import src.config as conf  # pylint: disable=import-outside-toplevel
+
+    if args.command == "tournament":
+        from src.tournament import run_tournament  # pylint: disable=import-outside-toplevel
+
+        frames = (args.frames, args.frame_format, args.frame_scale) if args.frames else None
+        summary = run_tournament(args.games, args.out, workers=args.workers, seed=args.seed,
+                                 grid_size=args.grid_size or conf.GRID_SIZE, ai=args.ai, max_ticks=args.max_ticks,
+                                 frames=frames)
+        print(f"{summary['games']} games in {summary['seconds']:.1f} s "
+              f"({summary['games_per_second']:.1f} games/s): player won {summary['player']}, "
+              f"enemy won {summary['enemy']}, draws {summary['draw']}, failed {summary['failed']}")
+        for name, results in summary["ai"].items():
+            print(f"{name} enemy won {results['enemy']} of {results['games']} games")
+        return
+
+    from src.game import Game  # pylint: disable=import-outside-toplevel
+
+    speed = conf.SIMULATION_SPEED
+    if args.speed is not None:
+        speed = args.speed or None
+    profiler = None
+    if args.profile:
+        from src.profiling import Profiler  # pylint: disable=import-outside-toplevel
+
+        profiler = Profiler(args.profile)
+        profiler.install()
+    enemy_ai = None
+    if args.ai == "lookahead":
+        from src.lookahead import LookaheadAI  # pylint: disable=import-outside-toplevel
+
+        enemy_ai = LookaheadAI()
+    game = Game(replay_path=args.replay, speed=speed, profiler=profiler, enemy_ai=enemy_ai,
+                config=conf.board_config(args.grid_size or conf.GRID_SIZE))
+
+    # main game loop
+    try:
+        while True:
+            game.update()
+    finally:
+        # the last ticks measured are written when the game is closed
+        if profiler is not None:
+            profiler.uninstall()
+
+
+if __name__ == "__main__":
+    main()
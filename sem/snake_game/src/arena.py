@@ -0,0 +1,104 @@
+"""Imports"""
+import numpy as np
+
+from src.config import DEFAULT_CONFIG
+from src.game_objects import EnemySnake, Food
+from src.grid import Grid
+
+
+class Arena:
+    """
+    Headless game of many AI snakes on one board. Snakes are told apart by their integer ids,
+    which are stored in the grid as owners of their tiles.
+    All snakes are updated together once per tick: the distance field to the food is updated
+    for the whole tick and every snake just follows it, so a tick costs one update of the field
+    plus a constant amount of work per snake.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Arena holds the board, all the snakes and the food together with per-snake results.
+
+    def __init__(self, n_snakes, seed=None, screen=None, n_food=1, config=DEFAULT_CONFIG):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Only the number of snakes is required, the rest are optional settings of the arena.
+        self.rng = np.random.default_rng(seed)
+        self.screen = screen
+        self.grid = Grid(config)
+        self.foods = [Food(self.grid, screen, self.rng) for _ in range(n_food)]
+        self.snakes = []
+        for snake_id in range(n_snakes):
+            start_pos = self.grid.random_free_cell(self.rng)
+            if start_pos is None:
+                raise ValueError(f"There is no space for {n_snakes} snakes on the board")
+            self.snakes.append(EnemySnake(self.grid, screen, self.foods[0], snake_id, start_pos))
+        self.alive = [True] * n_snakes
+        # number of eaten food of every snake
+        self.scores = [0] * n_snakes
+        # tick in which the snake died (None while it's alive)
+        self.death_ticks = [None] * n_snakes
+        self.ticks = 0
+        # food is spawned after the snakes, so that it won't spawn under them
+        self.spawn_food()
+
+    @property
+    def alive_count(self):
+        """Returns number of snakes which are still alive"""
+        return sum(self.alive)
+
+    @property
+    def is_over(self):
+        """Returns true once at most one snake is left (or none, if the arena was started with one snake)"""
+        return self.alive_count <= min(1, len(self.snakes) - 1)
+
+    @property
+    def winner(self):
+        """Returns id of the last surviving snake, or None while the game goes on or if nobody survived"""
+        if not self.is_over or not any(self.alive):
+            return None
+        return self.alive.index(True)
+
+    def spawn_food(self):
+        """Spawns again the food which was eaten"""
+        for food in self.foods:
+            food.try_to_spawn()
+
+    def kill(self, snake_id):
+        """Removes dead snake from the board"""
+        snake = self.snakes[snake_id]
+        self.alive[snake_id] = False
+        self.death_ticks[snake_id] = self.ticks
+        for cell in snake.body.iter_cells():
+            self.grid.change_cell("nothing", cell, self.screen)
+        snake.body.clear()
+
+    def step(self):
+        """Advances all living snakes by one tick, in order of their ids"""
+        if self.is_over:
+            return
+        self.ticks += 1
+        field = self.grid.food_distances()
+        for snake in self.snakes:
+            if not self.alive[snake.snake_id]:
+                continue
+            snake.steer_by_field(field)
+            length = snake.get_snake_len()
+            if not snake.advance():
+                self.kill(snake.snake_id)
+                continue
+            if snake.get_snake_len() > length:
+                self.scores[snake.snake_id] += 1
+        self.spawn_food()
+
+    def run(self, max_ticks=None):
+        """Runs the arena until at most one snake is left (or max_ticks pass). Returns the winner."""
+        while not self.is_over:
+            if max_ticks is not None and self.ticks >= max_ticks:
+                break
+            self.step()
+        return self.winner
+
+    def results(self):
+        """Returns per-snake results: score (eaten food), length and tick of death"""
+        return [{"id": snake.snake_id, "score": self.scores[snake.snake_id], "length": snake.get_snake_len(),
+                 "alive": self.alive[snake.snake_id], "death_tick": self.death_ticks[snake.snake_id]}
+                for snake in self.snakes]
@@ -0,0 +1,181 @@
+"""Imports"""
+import numpy as np
+
+from src.config import DEFAULT_CONFIG, MAX_LEN_DIFF
+from src.grid import TILE_CODES, WALKABLE_CODES, NOTHING
+
+# directions are encoded as integers in the same order as neighbours in pathfinding
+UP, DOWN, RIGHT, LEFT = range(4)
+DIRECTION_X = np.array([0, 0, 1, -1])
+DIRECTION_Y = np.array([-1, 1, 0, 0])
+OPPOSITE = np.array([DOWN, UP, LEFT, RIGHT])
+
+# snake indices in the batch arrays
+PLAYER, ENEMY = 0, 1
+SNAKE_CODES = np.array([TILE_CODES["player"], TILE_CODES["enemy"]], dtype=np.uint8)
+FOOD = TILE_CODES["food"]
+# values of the winner array
+NO_WINNER, PLAYER_WON, ENEMY_WON, DRAW = 0, 1, 2, 3
+
+
+class BatchEnv:
+    """
+    Many games stepped in lockstep. State of all games is stored in stacked numpy arrays
+    and the game rules are applied as array operations over all the games at once.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # The state of the games is split into several arrays, so that each can be updated as a whole.
+
+    def __init__(self, n_games, seed=None, config=DEFAULT_CONFIG):
+        self.n_games = n_games
+        # board of all the games (config.BoardConfig)
+        self.config = config
+        self.grid_size = grid_size = config.grid_size
+        self.cells = config.cells
+        self.rng = np.random.default_rng(seed)
+
+        # tile type codes of every game, same codes as in Grid
+        self.board = np.zeros((n_games, grid_size, grid_size), dtype=np.uint8)
+        self.flat_board = self.board.reshape(n_games, self.cells)
+        # bodies of both snakes as ring buffers of cell indices, head is at head_ptr
+        self.bodies = np.zeros((n_games, 2, self.cells), dtype=np.int32)
+        self.head_ptr = np.zeros((n_games, 2), dtype=np.int32)
+        self.lengths = np.zeros((n_games, 2), dtype=np.int32)
+        self.directions = np.zeros((n_games, 2), dtype=np.int8)
+        # cell index of the food in every game (-1 if the board is full, which ends the game)
+        self.food = np.zeros(n_games, dtype=np.int32)
+        self.winner = np.zeros(n_games, dtype=np.int8)
+        self.ticks = np.zeros(n_games, dtype=np.int64)
+        self.reset()
+
+    @property
+    def done(self):
+        """Mask of games which already ended"""
+        return self.winner != NO_WINNER
+
+    def heads(self, snake):
+        """Returns cell indices of heads of given snake in all games"""
+        return self.bodies[np.arange(self.n_games), snake, self.head_ptr[:, snake]]
+
+    def reset(self, mask=None):
+        """Starts new games in place of the games selected by the mask (all games by default)"""
+        games = np.arange(self.n_games) if mask is None else np.flatnonzero(mask)
+        if games.size == 0:
+            return
+        self.board[games] = NOTHING
+        self.head_ptr[games] = 0
+        self.lengths[games] = 1
+        self.winner[games] = NO_WINNER
+        self.ticks[games] = 0
+        self.directions[games, PLAYER] = RIGHT
+        self.directions[games, ENEMY] = LEFT
+        for snake, pos in ((PLAYER, self.config.player_start_pos), (ENEMY, self.config.enemy_start_pos)):
+            cell = int(pos.y) * self.grid_size + int(pos.x)
+            self.bodies[games, snake, 0] = cell
+            self.flat_board[games, cell] = SNAKE_CODES[snake]
+        self.spawn_food(games)
+
+    def spawn_food(self, games):
+        """
+        Spawns food on a random empty tile in each of the given games.
+        Games without an empty tile end, same as in the Engine: the longer snake wins and equal snakes draw.
+        """
+        if games.size == 0:
+            return
+        # random key for every empty tile, the tile with the highest key gets the food
+        keys = self.rng.random((games.size, self.cells))
+        free = self.flat_board[games] == NOTHING
+        keys[~free] = -1.0
+        cells = keys.argmax(axis=1)
+        has_space = free.any(axis=1)
+        self.food[games] = np.where(has_space, cells, -1)
+        self.flat_board[games[has_space], cells[has_space]] = FOOD
+
+        full = games[~has_space]
+        player_len = self.lengths[full, PLAYER]
+        enemy_len = self.lengths[full, ENEMY]
+        self.winner[full] = np.where(player_len > enemy_len, PLAYER_WON,
+                                     np.where(enemy_len > player_len, ENEMY_WON, DRAW))
+
+    def turn(self, games, snake, actions):
+        """Changes directions of the snake in given games. Turning back is ignored."""
+        last = self.directions[games, snake]
+        new = actions[games].astype(np.int8)
+        # direction can't be change by 180 degrees
+        new = np.where(new == OPPOSITE[last], last, new)
+        self.directions[games, snake] = new
+        return new
+
+    def neighbour_cells(self, cells, directions):
+        """
+        Returns cell indices next to given cells in given directions
+        together with a mask of cells which would be out of bounds (their index is 0).
+        """
+        x = cells % self.grid_size + DIRECTION_X[directions]
+        y = cells // self.grid_size + DIRECTION_Y[directions]
+        out = (x < 0) | (y < 0) | (x >= self.grid_size) | (y >= self.grid_size)
+        return np.where(out, 0, y * self.grid_size + x), out
+
+    def move(self, snake, actions):
+        """Moves given snake in all running games in direction given by actions."""
+        games = np.flatnonzero(~self.done)
+        if games.size == 0:
+            return
+        directions = self.turn(games, snake, actions)
+        ptr = self.head_ptr[games, snake]
+        cells, out = self.neighbour_cells(self.bodies[games, snake, ptr], directions)
+        under_head = self.flat_board[games, cells]
+
+        # collided snake loses
+        died = out | ~WALKABLE_CODES[under_head]
+        self.winner[games[died]] = ENEMY_WON if snake == PLAYER else PLAYER_WON
+
+        ok = ~died
+        games, cells, eaten = games[ok], cells[ok], under_head[ok] == FOOD
+        ptr = (ptr[ok] + 1) % self.cells
+        self.head_ptr[games, snake] = ptr
+        self.bodies[games, snake, ptr] = cells
+        self.flat_board[games, cells] = SNAKE_CODES[snake]
+
+        # remove last snake piece if no food was consumed
+        self.lengths[games[eaten], snake] += 1
+        stay = games[~eaten]
+        tail_ptr = (ptr[~eaten] - self.lengths[stay, snake]) % self.cells
+        self.flat_board[stay, self.bodies[stay, snake, tail_ptr]] = NOTHING
+
+        self.spawn_food(games[eaten])
+        # games which ended by the full board keep their result
+        self.check_size_diff(games[self.winner[games] == NO_WINNER])
+
+    def check_size_diff(self, games):
+        """If one snake is significantly larger than the other, the bigger one wins"""
+        player_len = self.lengths[games, PLAYER]
+        enemy_len = self.lengths[games, ENEMY]
+        self.winner[games[enemy_len > player_len + MAX_LEN_DIFF]] = ENEMY_WON
+        self.winner[games[enemy_len + MAX_LEN_DIFF < player_len]] = PLAYER_WON
+
+    def step(self, player_actions, enemy_actions):
+        """
+        Advances all running games by one tick, the player moves first and then the enemy.
+        Returns the winner array (NO_WINNER for games which go on).
+        """
+        self.move(PLAYER, np.asarray(player_actions))
+        # same as in the Engine, the tick counts once the player survived its move
+        self.ticks[~self.done] += 1
+        self.move(ENEMY, np.asarray(enemy_actions))
+        return self.winner
+
+    def greedy_actions(self, snake):
+        """
+        Simple vectorised controller. Picks for every game the direction towards the food
+        which doesn't collide right away.
+        """
+        # shape (n_games, 4): cells after moving in each direction
+        cells, out = self.neighbour_cells(self.heads(snake)[:, None], np.arange(4))
+        safe = ~out & WALKABLE_CODES[np.take_along_axis(self.flat_board, cells, axis=1)]
+        dist = (np.abs(cells % self.grid_size - (self.food % self.grid_size)[:, None])
+                + np.abs(cells // self.grid_size - (self.food // self.grid_size)[:, None]))
+        # unsafe directions are only picked when there is nothing else
+        score = np.where(safe, dist, dist + 4 * self.cells)
+        return score.argmin(axis=1)
@@ -0,0 +1,294 @@
+"""Imports"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from src.config import GRID_SIZE, TILE_SIZE, DEFAULT_CONFIG, board_config
+from src.arena import Arena
+from src.engine import Engine
+from src.env import SnakeEnv
+from src.game_objects import Food
+from src.grid import Grid
+from src.pathfinding import PathFinder
+from src.vector import Vector2
+
+# board sizes used for pathfinding benchmarks
+BENCHMARK_GRID_SIZES = (20, 50, 100, 200)
+# board size of the game benchmark on a large board
+BENCHMARK_LARGE_GRID_SIZE = 100
+# numbers of snakes in arena benchmarks
+BENCHMARK_ARENA_SNAKES = (4, 16)
+# directory with __main__.py and the src package, startup benchmarks run there
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# arguments of a fresh interpreter for startup benchmarks: command line tool, and a worker which only simulates
+STARTUP_COMMANDS = {
+    "startup_cli": ["__main__.py", "--help"],
+    "startup_simulation": ["-c", "from src.engine import Engine; Engine(seed=0).step()"],
+}
+# current result is a regression if it is slower than the baseline by more than this fraction
+DEFAULT_TOLERANCE = 0.5
+
+# obstacles of the board from tests/test_game.py (the enemy snake is the obstacle)
+TEST_OBSTACLES = [
+    (0, 1), (1, 1), (1, 2), (4, 2), (5, 2), (6, 2), (5, 3), (5, 4), (1, 5),
+    (2, 5), (1, 6), (1, 7), (1, 8), (1, 9), (8, 5), (9, 5), (5, 6), (5, 7),
+    (6, 7), (7, 8), (8, 8), (9, 8), (7, 9), (10, 0), (10, 1), (10, 2), (10, 3),
+    (10, 4), (10, 5), (10, 6), (10, 7), (10, 8), (10, 9), (10, 10), (9, 10),
+    (8, 10), (7, 10), (6, 10), (5, 10), (4, 10), (3, 10), (2, 10), (1, 10), (0, 10),
+]
+
+# name of the benchmark -> function which prepares the benchmark and returns the measured operation
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Registers the decorated setup function as a benchmark"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def random_maze(size, density, seed):
+    """Returns flat walkable flags of a board with randomly placed obstacles (corners are always free)"""
+    walkable = np.random.default_rng(seed).random(size * size) >= density
+    walkable[0] = walkable[-1] = True
+    return bytearray(walkable.astype(np.uint8).tobytes())
+
+
+def long_snake_board(size):
+    """
+    Returns flat walkable flags of a board filled with a long snake in zigzag,
+    so that the only path from corner to corner goes through the whole board.
+    """
+    walkable = np.ones((size, size), dtype=np.uint8)
+    walkable[1::2, :] = 0
+    # every blocked row has a gap on alternating sides
+    walkable[1::4, -1] = 1
+    walkable[3::4, 0] = 1
+    return bytearray(walkable.tobytes())
+
+
+@benchmark("shortest_path_test_board")
+def bench_shortest_path_test_board():
+    """Pathfinding on the board from the tests"""
+    grid = Grid()
+    for x, y in TEST_OBSTACLES:
+        grid.change_tile("enemy", Vector2(x, y), None, False)
+    return lambda: grid.shortest_path(Vector2(0, 0), Vector2(9, 6))
+
+
+def bench_path(size, walkable):
+    """Returns pathfinding from corner to corner of given board"""
+    finder = PathFinder(size)
+    return lambda: finder.shortest_path(walkable, 0, size * size - 1)
+
+
+for bench_size in BENCHMARK_GRID_SIZES:
+    benchmark(f"shortest_path_maze_{bench_size}")(
+        lambda size=bench_size: bench_path(size, random_maze(size, 0.25, seed=size)))
+    benchmark(f"shortest_path_long_snake_{bench_size}")(
+        lambda size=bench_size: bench_path(size, long_snake_board(size)))
+
+
+@benchmark("engine_step")
+def bench_engine_step(config=DEFAULT_CONFIG):
+    """One tick of a game with both snakes controlled by the AI"""
+    engines = [Engine(seed=0, config=config)]
+
+    def step():
+        engine = engines[0]
+        if engine.is_over:
+            engine = engines[0] = Engine(seed=engine.ticks, config=config)
+        engine.player.steer_to_food()
+        engine.step()
+    return step
+
+
+benchmark(f"engine_step_{BENCHMARK_LARGE_GRID_SIZE}")(
+    lambda: bench_engine_step(board_config(BENCHMARK_LARGE_GRID_SIZE)))
+
+
+@benchmark("enemy_move")
+def bench_enemy_move():
+    """Enemy snake move (including the AI) while the player stands still"""
+    engines = [Engine(seed=0)]
+
+    def move():
+        engine = engines[0]
+        if engine.is_over:
+            engine = engines[0] = Engine(seed=engine.ticks)
+        engine.move_enemy()
+    return move
+
+
+@benchmark("engine_fork")
+def bench_engine_fork():
+    """Game forked by a snapshot, played 10 ticks ahead and restored"""
+    engine = Engine(seed=0)
+    for _ in range(20):
+        engine.player.steer_to_food()
+        engine.step()
+
+    def fork():
+        snapshot = engine.snapshot()
+        for _ in range(10):
+            engine.player.steer_to_food()
+            engine.step()
+        engine.restore(snapshot)
+    return fork
+
+
+@benchmark("env_step")
+def bench_env_step():
+    """Step of the learning environment with 4 stacked frames and random actions, finished episodes start again"""
+    env = SnakeEnv(seed=0, frame_stack=4)
+    env.reset()
+    actions = np.random.default_rng(0).integers(4, size=1024).tolist()
+    ticks = [0]
+
+    def step():
+        ticks[0] += 1
+        _, _, terminated, truncated, _ = env.step(actions[ticks[0] % len(actions)])
+        if terminated or truncated:
+            env.reset()
+    return step
+
+
+@benchmark("player_move")
+def bench_player_move():
+    """Player snake move around the border of the board"""
+    engines = [Engine(seed=0)]
+    turns = {(GRID_SIZE - 1, 0): Vector2(0, 1), (GRID_SIZE - 1, GRID_SIZE - 1): Vector2(-1, 0),
+             (0, GRID_SIZE - 1): Vector2(0, -1), (0, 0): Vector2(1, 0)}
+
+    def move():
+        engine = engines[0]
+        if engine.is_over:
+            engine = engines[0] = Engine(seed=engine.ticks)
+        head = engine.player.body[-1]
+        turn = turns.get((int(head.x), int(head.y)))
+        if turn is not None:
+            engine.player.change_direction(turn)
+        engine.move_player()
+    return move
+
+
+def bench_arena_step(n_snakes):
+    """One tick of an arena, all snakes share one update of the food distance field"""
+    arenas = [Arena(n_snakes, seed=0, n_food=n_snakes // 4)]
+
+    def step():
+        arena = arenas[0]
+        if arena.is_over:
+            arena = arenas[0] = Arena(n_snakes, seed=arena.ticks, n_food=n_snakes // 4)
+        arena.step()
+    return step
+
+
+for bench_snakes in BENCHMARK_ARENA_SNAKES:
+    benchmark(f"arena_step_{bench_snakes}")(lambda n_snakes=bench_snakes: bench_arena_step(n_snakes))
+
+
+@benchmark("food_spawn_full_board")
+def bench_food_spawn_full_board():
+    """Food spawning on a board where only a few tiles are empty"""
+    grid = Grid()
+    for y in range(GRID_SIZE):
+        for x in range(GRID_SIZE):
+            if y * GRID_SIZE + x >= 10:
+                grid.change_tile("player", Vector2(x, y), None, False)
+    food = Food(grid, None, np.random.default_rng(0))
+
+    def spawn():
+        if food.is_spawned:
+            grid.change_tile("nothing", food.pos, None, False)
+            food.is_spawned = False
+        food.try_to_spawn()
+    return spawn
+
+
+@benchmark("draw_all")
+def bench_draw_all():
+    """Drawing of the whole board on an offscreen surface"""
+    grid = Grid()
+    surface = pygame.Surface((GRID_SIZE * TILE_SIZE, GRID_SIZE * TILE_SIZE))
+
+    def draw():
+        grid.draw_all(surface)
+        grid.dirty_rects.clear()
+    return draw
+
+
+def bench_startup(arguments):
+    """Returns start of a new interpreter running the arguments, including all imports"""
+    return lambda: subprocess.run([sys.executable, *arguments], cwd=PACKAGE_DIR, check=True,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+for bench_name, bench_arguments in STARTUP_COMMANDS.items():
+    benchmark(bench_name)(lambda arguments=bench_arguments: bench_startup(arguments))
+
+
+def measure(operation, repeat=5, min_time=0.05):
+    """
+    Returns the best time of one call of the operation in seconds.
+    Operation is called in batches long at least min_time, best of the repeated batches is used.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run_benchmarks(names=None, repeat=5):
+    """Runs selected benchmarks (all by default). Returns dict with seconds per operation."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure(setup(), repeat)
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns dict of benchmarks slower than the baseline by more than the tolerance, with their slowdown ratio"""
+    regressions = {}
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        ratio = seconds / baseline[name]
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+    return regressions
+
+
+def save_results(results, path):
+    """Saves results as JSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path):
+    """Loads results saved by save_results"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
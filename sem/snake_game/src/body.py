@@ -0,0 +1,77 @@
+"""Imports"""
+from src.config import DEFAULT_CONFIG
+from src.vector import Vector2
+
+
+class SnakeBody:
+    """
+    Body of a snake as a preallocated ring buffer of cell indices (y * grid size + x), from the tail to the head.
+    Moving and growing only overwrite preallocated slots, length, head and tail are O(1).
+    Collisions are checked on the board (Grid.padded_walkable), which covers the bodies of all the snakes.
+    Indexing and iterating gives positions as Vector2, same as the deque of positions used before.
+    """
+
+    def __init__(self, config=DEFAULT_CONFIG, capacity=None):
+        self.grid_size = config.grid_size
+        # the body can't be longer than the whole board, the head isn't added on a fatal move
+        self.capacity = capacity = config.cells if capacity is None else capacity
+        self.cells = [0] * capacity
+        self.head_ptr = capacity - 1
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not -self.length <= index < self.length:
+            raise IndexError("snake body index out of range")
+        cell = self.cells[(self.head_ptr - self.length + 1 + index % self.length) % self.capacity]
+        return Vector2(cell % self.grid_size, cell // self.grid_size)
+
+    def __iter__(self):
+        for cell in self.iter_cells():
+            yield Vector2(cell % self.grid_size, cell // self.grid_size)
+
+    @property
+    def head(self):
+        """Cell index of the head"""
+        return self.cells[self.head_ptr]
+
+    @property
+    def tail(self):
+        """Cell index of the last piece"""
+        return self.cells[(self.head_ptr - self.length + 1) % self.capacity]
+
+    def iter_cells(self):
+        """Yields cell indices from the tail to the head"""
+        start = self.head_ptr - self.length + 1
+        for ptr in range(start, start + self.length):
+            yield self.cells[ptr % self.capacity]
+
+    def append(self, cell):
+        """Adds new head"""
+        self.head_ptr = (self.head_ptr + 1) % self.capacity
+        self.cells[self.head_ptr] = cell
+        self.length += 1
+
+    def appendleft(self, cell):
+        """Adds new last piece"""
+        self.cells[(self.head_ptr - self.length) % self.capacity] = cell
+        self.length += 1
+
+    def pop(self):
+        """Removes the head, returns its cell index"""
+        cell = self.cells[self.head_ptr]
+        self.head_ptr = (self.head_ptr - 1) % self.capacity
+        self.length -= 1
+        return cell
+
+    def popleft(self):
+        """Removes the last piece, returns its cell index"""
+        cell = self.tail
+        self.length -= 1
+        return cell
+
+    def clear(self):
+        """Removes the whole body"""
+        self.length = 0
@@ -1,19 +1,23 @@
 """Imports"""
-from pygame.math import Vector2
+from functools import lru_cache
+
+from src.pathfinding import neighbour_table
+from src.vector import Vector2
 
 # BOARD
 TILE_SIZE = 40
 GRID_SIZE = 20  # number of tiles
 PLAYER_START_POS = Vector2(0, 0)  # in tiles
-ENEMY_START_POS = Vector2(GRID_SIZE - 1, GRID_SIZE - 1)  # in tiles
-PLAYER_SCORE_POS = Vector2(0, GRID_SIZE - 1)  # in tiles
-ENEMY_SCORE_POS = Vector2(GRID_SIZE - 1, GRID_SIZE - 1)  # in tiles
 SCORE_FONT_SIZE = 55
 
 # GAME STUFF
 FRAMERATE = 60
 MOVE_INTERVAL = 150  # in milliseconds
+MAX_TICKS_PER_FRAME = 10  # simulation catches up at most this many moves in one frame
+SIMULATION_SPEED = 1.0  # multiplier of the game speed, None to simulate as fast as possible
 MAX_LEN_DIFF = 10
+AI_TIME_BUDGET = 0.005  # in seconds, hard limit of one move of the lookahead AI
+AI_MAX_DEPTH = 12  # moves searched ahead by the lookahead AI
 
 # COLORS
 BACKGROUND_COLOR = (16, 126, 125)
@@ -27,8 +31,73 @@ TEXT_COLOR = (250, 250, 250)
 # MENU
 TITLE_FONT = "arialblack"
 TITLE_FONT_SIZE = 55
-TITLE_POS = Vector2(TILE_SIZE * GRID_SIZE // 2, TILE_SIZE * GRID_SIZE // 3)
 TEXT_FONT = "arialblack"
 TEXT_FONT_SIZE = 35
-TEXT_POS = Vector2(TILE_SIZE * GRID_SIZE // 2,
-                   (TILE_SIZE * GRID_SIZE // 4) * 2)
+
+# PROFILER OVERLAY
+OVERLAY_FONT = "couriernew"
+OVERLAY_FONT_SIZE = 14
+OVERLAY_BACKGROUND_COLOR = (0, 0, 0)
+
+
+class BoardConfig:
+    """
+    Size of one board together with all values derived from it, computed once when the config is created.
+    Grid, snakes and the game take it as a parameter, so boards of different sizes can be played in one process.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # The config is just a bundle of precomputed values, which are read in the hot loops of the game.
+
+    def __init__(self, grid_size=GRID_SIZE, tile_size=TILE_SIZE):
+        self.grid_size = grid_size  # number of tiles
+        self.tile_size = tile_size
+        self.cells = grid_size * grid_size
+        self.screen_size = (tile_size * grid_size, tile_size * grid_size)  # in pixels
+        self.player_start_pos = Vector2(PLAYER_START_POS)  # in tiles
+        self.enemy_start_pos = Vector2(grid_size - 1, grid_size - 1)  # in tiles
+        self.player_score_pos = Vector2(0, grid_size - 1)  # in tiles
+        self.enemy_score_pos = Vector2(grid_size - 1, grid_size - 1)  # in tiles
+        self.title_pos = Vector2(tile_size * grid_size // 2, tile_size * grid_size // 3)  # in pixels
+        self.text_pos = Vector2(tile_size * grid_size // 2, (tile_size * grid_size // 4) * 2)  # in pixels
+        # top left corner (in pixels) of every cell index (y * grid_size + x)
+        self.pixel_offsets = tuple((idx % grid_size * tile_size, idx // grid_size * tile_size)
+                                   for idx in range(self.cells))
+        # cell indices of the neighbours of every cell (up, down, right, left), shared with pathfinding
+        self.neighbours = neighbour_table(grid_size)
+
+        # Cells can be also indexed on a board padded by one tile on every side,
+        # padded index is (y + 1) * padded_size + x + 1. Neighbours of any cell of the board
+        # are then valid indices as well, the border marks them as out of bounds without any checks.
+        self.padded_size = padded_size = grid_size + 2
+        # offsets of the neighbours in padded indices (up, down, right, left)
+        self.padded_offsets = (-padded_size, padded_size, 1, -1)
+        # padded index of every cell index
+        self.padded_cells = tuple((idx // grid_size + 1) * padded_size + idx % grid_size + 1
+                                  for idx in range(self.cells))
+        # cell index of every padded index (-1 for the border)
+        unpadded_cells = [-1] * (padded_size * padded_size)
+        for idx, padded in enumerate(self.padded_cells):
+            unpadded_cells[padded] = idx
+        self.unpadded_cells = tuple(unpadded_cells)
+        # coordinates of padded indices, so that no division is needed
+        self.padded_x = tuple(padded % padded_size - 1 for padded in range(padded_size * padded_size))
+        self.padded_y = tuple(padded // padded_size - 1 for padded in range(padded_size * padded_size))
+
+    def cell_index(self, pos):
+        """Returns cell index of a position in tiles"""
+        return int(pos.y) * self.grid_size + int(pos.x)
+
+    def cell_pos(self, idx):
+        """Returns position in tiles of a cell index"""
+        return Vector2(idx % self.grid_size, idx // self.grid_size)
+
+
+@lru_cache(maxsize=None)
+def board_config(grid_size):
+    """Returns config of a board with given number of tiles, shared by all games on boards of that size"""
+    return BoardConfig(grid_size)
+
+
+# config of the board of the interactive game
+DEFAULT_CONFIG = board_config(GRID_SIZE)
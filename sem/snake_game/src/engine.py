@@ -0,0 +1,155 @@
+"""Imports"""
+import numpy as np
+
+import src.config as conf
+from src.game_objects import PlayerSnake, Food, EnemySnake
+from src.grid import Grid
+from src.replay import ReplayRecorder, new_seed
+
+
+class Engine:
+    """
+    Simulation core of the game. Advances the game in discrete ticks
+    and doesn't need any display, fonts or timers.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Engine holds all game objects together with the state needed to reproduce the game.
+
+    def __init__(self, screen=None, seed=None, record=False, enemy_ai=None, config=conf.DEFAULT_CONFIG):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Everything except the screen is optional, most games need only a few of the settings.
+        # screen is optional, without it the game runs headless
+        # seed of the random generator, game with the same seed and inputs plays out the same
+        self.seed = new_seed() if seed is None else seed
+        # the recorder stores direction changes and food spawns, so the game can be replayed
+        self.recorder = ReplayRecorder(self.seed, config.grid_size) if record else None
+        # board of the size given by the config (config.BoardConfig), shared by the snakes and the food
+        self.grid = Grid(config)
+        self.food = Food(self.grid, screen, np.random.default_rng(self.seed))
+        self.player = PlayerSnake(self.grid, screen, self.food)
+        # enemy follows the shortest path to the food unless it gets a smarter AI (lookahead.LookaheadAI)
+        self.enemy = EnemySnake(self.grid, screen, self.food, ai=enemy_ai)
+        if enemy_ai is not None:
+            enemy_ai.opponents = [self.player]
+        # direction the player moved in last, changes of it are recorded
+        self.player_direction = None
+
+        self.ticks = 0
+        # "player" or "enemy" once the game is over (stays None if it ended in a draw)
+        self.winner = None
+        # true once the food had no empty tile left to spawn on, which ends the game
+        self.board_full = False
+        # food is spawned after the snakes, so that it won't spawn under them
+        self.try_to_spawn_food()
+
+    @property
+    def is_over(self):
+        """Returns true if one of the snakes already won or the board is full"""
+        return self.winner is not None or self.board_full
+
+    def check_size_diff(self):
+        """If one snake is significantly larger than the other, the bigger one wins"""
+        player_len = self.player.get_snake_len()
+        enemy_len = self.enemy.get_snake_len()
+
+        if enemy_len > player_len + conf.MAX_LEN_DIFF:
+            self.end("enemy")
+        elif enemy_len + conf.MAX_LEN_DIFF < player_len:
+            self.end("player")
+
+    def try_to_spawn_food(self):
+        """Spawns new food if it was eaten"""
+        if self.food.is_spawned and not self.food.is_eaten():
+            return
+        if not self.food.try_to_spawn():
+            # no empty tile is left, the longer snake wins and snakes of the same length draw
+            self.board_full = True
+            player_len = self.player.get_snake_len()
+            enemy_len = self.enemy.get_snake_len()
+            self.end("player" if player_len > enemy_len else "enemy" if enemy_len > player_len else None)
+            return
+        if self.recorder is not None:
+            self.recorder.food(self.ticks, self.food.pos)
+
+    def update_after_snake_move(self):
+        """Updates all things that could change after one of the snakes moved."""
+        self.try_to_spawn_food()
+        if not self.board_full:
+            self.check_size_diff()
+
+    def end(self, winner):
+        """Ends the game with given winner"""
+        self.winner = winner
+        if self.recorder is not None:
+            self.recorder.end(self.ticks, winner)
+
+    def move_player(self):
+        """Moves the player snake. Enemy wins if the player collided."""
+        if self.is_over:
+            return
+        if self.recorder is not None and self.player.direction != self.player_direction:
+            self.recorder.direction(self.ticks, self.player.direction)
+        self.player_direction = self.player.direction
+        if not self.player.move():
+            self.end("enemy")
+            return
+        self.update_after_snake_move()
+
+    def move_enemy(self):
+        """Moves the enemy snake, which finishes the tick. Player wins if the enemy collided."""
+        if self.is_over:
+            return
+        self.ticks += 1
+        if not self.enemy.move():
+            self.end("player")
+            return
+        self.update_after_snake_move()
+
+    def step(self, player_direction=None):
+        """
+        Advances the game by one tick. The player moves first and then the enemy,
+        same as with the offset timers in the interactive game.
+        Returns the winner or None if the game goes on.
+        """
+        if self.is_over:
+            return self.winner
+        if player_direction is not None:
+            self.player.change_direction(player_direction)
+        self.move_player()
+        self.move_enemy()
+        return self.winner
+
+    def snapshot(self):
+        """
+        Returns a point the game can be restored to. Taking and restoring it costs
+        O(changes made in between), so it's cheap enough for rollbacks and searching ahead.
+        """
+        return (self.grid.checkpoint(), self.player.checkpoint(), self.enemy.checkpoint(), self.food.snapshot(),
+                self.ticks, self.winner, self.board_full, self.player_direction,
+                len(self.recorder.data) if self.recorder is not None else 0)
+
+    def restore(self, snapshot):
+        """Returns the game to the state from the snapshot, later snapshots can't be restored anymore"""
+        (grid, player, enemy, food, self.ticks, self.winner, self.board_full, self.player_direction,
+         recorded) = snapshot
+        self.grid.undo(grid)
+        self.player.undo(player)
+        self.enemy.undo(enemy)
+        self.food.restore(food)
+        if self.recorder is not None:
+            del self.recorder.data[recorded:]
+
+    def end_snapshots(self):
+        """Stops logging changes needed for restoring the snapshots taken so far"""
+        self.grid.end_journal()
+        self.player.end_journal()
+        self.enemy.end_journal()
+
+    def run(self, max_ticks=None):
+        """Runs the game until one of the snakes wins (or max_ticks pass). Returns the winner."""
+        while not self.is_over:
+            if max_ticks is not None and self.ticks >= max_ticks:
+                break
+            self.step()
+        return self.winner
@@ -0,0 +1,244 @@
+"""Imports"""
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.config import DEFAULT_CONFIG, board_config
+from src.engine import Engine
+from src.game_objects import DIRECTIONS
+
+# episodes longer than this are truncated
+MAX_EPISODE_TICKS = 5000
+# rewards of the agent (the enemy snake)
+FOOD_REWARD = 1.0
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+
+
+class ActionController:
+    """AI of a snake which only follows actions given from outside, used for the agent of the environment"""
+
+    # pylint: disable=too-few-public-methods
+    # The controller only implements the interface of the AI of a snake (see lookahead.LookaheadAI).
+
+    def __init__(self):
+        # index into game_objects.DIRECTIONS (up, down, right, left)
+        self.action = 0
+        # set by the engine, the agent sees the opponents on the board
+        self.opponents = []
+
+    def choose_direction(self, snake):
+        """Returns direction of the last action, the snake can't turn back same as the player"""
+        direction = DIRECTIONS[self.action]
+        return snake.direction if direction == -snake.last_direction else direction
+
+
+class SnakeEnv:
+    """
+    Reset/step environment of the game in the style of Gym. The agent controls the enemy snake
+    against the player snake following the shortest path to the food.
+    Actions are indices of game_objects.DIRECTIONS (up, down, right, left).
+
+    Observation has shape (frame_stack, grid size, grid size) with tile type codes (grid.TILE_TYPES)
+    of the last boards, the oldest first. It is a NumPy view, nothing is converted or allocated per step:
+    without frame stacking it's a view of the board of the game itself, which changes in place,
+    with frame stacking it's a view of a preallocated ring of frames. Copy it to keep it past the next step.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # The environment keeps the game, its settings and the ring of frames for stacking.
+
+    def __init__(self, seed=None, config=DEFAULT_CONFIG, frame_stack=1, max_ticks=MAX_EPISODE_TICKS):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # All the arguments are optional settings of the environment.
+        self.config = config
+        self.frame_stack = frame_stack
+        self.max_ticks = max_ticks
+        # seeds of the games of the episodes
+        self.rng = np.random.default_rng(seed)
+        self.controller = ActionController()
+        self.engine = None
+        size = config.grid_size
+        # Every frame is stored twice (at slot and slot + frame_stack), so the last frame_stack frames
+        # are always contiguous in the ring and the observation is just a slice of it.
+        self.frames = np.zeros((2 * frame_stack, size, size), dtype=np.uint8) if frame_stack > 1 else None
+        # slot of the next frame
+        self.frame_slot = 0
+        self.observation = None
+
+    def reset(self, seed=None):
+        """Starts a new episode, returns (observation, info)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.engine = Engine(seed=int(self.rng.integers(2 ** 63)), enemy_ai=self.controller, config=self.config)
+        board = self.engine.grid.types
+        if self.frames is None:
+            self.observation = board[np.newaxis]
+        else:
+            # the ring starts filled with the first board
+            self.frames[:] = board
+            self.frame_slot = 0
+            self.observation = self.frames[self.frame_stack:]
+        return self.observation, self.info()
+
+    def push_frame(self):
+        """Stores the current board into the ring of frames and moves the observation to it"""
+        slot = self.frame_slot
+        self.frames[slot] = self.frames[slot + self.frame_stack] = self.engine.grid.types
+        self.frame_slot = (slot + 1) % self.frame_stack
+        self.observation = self.frames[slot + 1:slot + 1 + self.frame_stack]
+
+    def step(self, action):
+        """
+        Plays one tick with the agent moving in the direction of the action.
+        Returns (observation, reward, terminated, truncated, info).
+        """
+        engine = self.engine
+        length = engine.enemy.get_snake_len()
+        self.controller.action = action
+        engine.player.steer_to_food()
+        engine.step()
+        if self.frames is not None:
+            self.push_frame()
+
+        reward = FOOD_REWARD * (engine.enemy.get_snake_len() - length)
+        if engine.winner == "enemy":
+            reward += WIN_REWARD
+        elif engine.winner == "player":
+            reward += LOSS_REWARD
+        truncated = not engine.is_over and engine.ticks >= self.max_ticks
+        return self.observation, reward, engine.is_over, truncated, self.info()
+
+    def info(self):
+        """Returns additional information about the episode"""
+        engine = self.engine
+        return {"ticks": engine.ticks, "winner": engine.winner,
+                "length": engine.enemy.get_snake_len(), "opponent_length": engine.player.get_snake_len()}
+
+
+def shared_array(memory, shape, dtype):
+    """Returns NumPy array of given shape over the shared memory"""
+    return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def run_worker(connection, memories, shapes, first_env, seeds, settings):
+    """
+    Runs part of the environments of VectorEnv in a worker process. The environments read their actions
+    from the shared memory and write observations and results there, only short commands go through the pipe.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    # The worker gets all its shared buffers and settings at once when it's started.
+    grid_size, frame_stack, max_ticks = settings
+    observations, actions, rewards, terminated, truncated, final_observations = (
+        shared_array(memory, shape, dtype) for memory, (shape, dtype) in zip(memories, shapes))
+    envs = [SnakeEnv(seed, board_config(grid_size), frame_stack, max_ticks) for seed in seeds]
+    env_ids = range(first_env, first_env + len(envs))
+    while (command := connection.recv()) != "close":
+        for i, env in zip(env_ids, envs):
+            if command == "reset":
+                observations[i] = env.reset()[0]
+                continue
+            observation, rewards[i], terminated[i], truncated[i], _ = env.step(int(actions[i]))
+            if terminated[i] or truncated[i]:
+                # finished episodes start again right away, the observation is the first one of the new episode
+                # and the last one of the finished episode is kept aside (a truncated one can be bootstrapped from)
+                final_observations[i] = observation
+                observation = env.reset()[0]
+            observations[i] = observation
+        connection.send(None)
+    connection.close()
+    # views of the memory have to be released before it's closed
+    del observations, actions, rewards, terminated, truncated, final_observations
+    for memory in memories:
+        memory.close()
+
+
+class VectorEnv:
+    """
+    Many SnakeEnv environments stepped together in worker processes. Observations, actions and results
+    of all the environments live in shared memory, the returned arrays are views of it
+    (valid until the next step), so no observation is pickled or sent through pipes.
+    Unlike with SnakeEnv itself, every observation is copied once per step, into the shared memory.
+    Environments whose episode ended are reset automatically, the last observation of the ended episode
+    is in final_observations.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Besides the workers, the wrapper keeps views of all the shared buffers.
+
+    def __init__(self, n_envs, workers=None, seed=None, config=DEFAULT_CONFIG, frame_stack=1,
+                 max_ticks=MAX_EPISODE_TICKS):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # All the arguments except the number of environments are optional settings.
+        self.n_envs = n_envs
+        size = config.grid_size
+        # (shape, dtype) of the observations, actions, rewards, terminated and truncated flags
+        # and of the last observations of the ended episodes
+        self.shapes = (((n_envs, frame_stack, size, size), np.uint8), ((n_envs,), np.int64), ((n_envs,), np.float32),
+                       ((n_envs,), np.bool_), ((n_envs,), np.bool_), ((n_envs, frame_stack, size, size), np.uint8))
+        self.memories = [shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                         for shape, dtype in self.shapes]
+        self.observations, self.actions, self.rewards, self.terminated, self.truncated, self.final_observations = (
+            shared_array(memory, shape, dtype) for memory, (shape, dtype) in zip(self.memories, self.shapes))
+        self.connections = []
+        self.processes = []
+        self.start_workers(min(workers or multiprocessing.cpu_count(), n_envs), seed, (size, frame_stack, max_ticks))
+
+    def start_workers(self, workers, seed, settings):
+        """Starts worker processes, the environments are split between them as evenly as possible"""
+        seeds = np.random.SeedSequence(seed).spawn(self.n_envs)
+        bounds = np.linspace(0, self.n_envs, workers + 1).astype(int)
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker, daemon=True,
+                args=(child, self.memories, self.shapes, int(first), seeds[first:last], settings))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def command(self, command):
+        """Sends the command to all the workers and waits until all of them finish it"""
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self):
+        """Starts new episodes in all the environments, returns observations (n_envs, frame_stack, size, size)"""
+        self.command("reset")
+        return self.observations
+
+    def step(self, actions):
+        """
+        Plays one tick in all the environments with given actions.
+        Returns observations, rewards, terminated and truncated, each with the environments in the first axis.
+        Environments which ended their episode already return the first observation of the next one,
+        the last observation of the ended episode is in final_observations (valid until the next step).
+        """
+        self.actions[:] = actions
+        self.command("step")
+        return self.observations, self.rewards, self.terminated, self.truncated
+
+    def close(self):
+        """Stops the workers and frees the shared memory"""
+        if not self.processes:
+            return
+        for connection in self.connections:
+            connection.send("close")
+        for process in self.processes:
+            process.join()
+        self.processes.clear()
+        # views of the memory have to be released before it's closed
+        del self.observations, self.actions, self.rewards, self.terminated, self.truncated, self.final_observations
+        for memory in self.memories:
+            memory.close()
+            memory.unlink()
@@ -1,33 +1,55 @@
 """Imports"""
 import sys
 
+import pygame
+
 import src.config as conf
-from src.game_objects import PlayerSnake, Food, EnemySnake
-from src.grid import Grid
+from src.engine import Engine
+from src.replay import numbered_path
+from src.scheduler import TickScheduler
+from src.text import get_font, render_text
+from src.vector import Vector2
 
-import pygame
-from pygame.math import Vector2
 
 class Game:
     """Main class managing the game"""
 
     # pylint: disable=too-many-instance-attributes
-    # This class needs to handle all game objects, so 9 attributes are reasonable in this case.
-
-    def __init__(self):
-        pygame.init()
+    # This class needs to handle the display, timing and the game itself, so 13 attributes are reasonable in this case.
+
+    def __init__(self, replay_path=None, speed=conf.SIMULATION_SPEED, profiler=None, enemy_ai=None,
+                 config=conf.DEFAULT_CONFIG):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # All the arguments are optional settings of the game.
+        # only the display (with events) is needed, fonts are initialized once the first text is rendered
+        pygame.display.init()
         pygame.display.set_caption("Snake game")
-        self.screen = pygame.display.set_mode(
-            (conf.TILE_SIZE * conf.GRID_SIZE, conf.TILE_SIZE * conf.GRID_SIZE))
+        # size of the board with positions of everything on the screen (config.BoardConfig)
+        self.config = config
+        width, height = config.screen_size
+        if profiler is not None:
+            # the profiler overlay gets a panel below the board, so that it never covers any tiles
+            font = get_font(conf.OVERLAY_FONT, conf.OVERLAY_FONT_SIZE)
+            height += font.get_linesize() * len(profiler.overlay_lines())
+        self.screen = pygame.display.set_mode((width, height))
         self.clock = pygame.time.Clock()
-        self.player_update = pygame.USEREVENT
-        self.enemy_update = pygame.USEREVENT + 1
+        # milliseconds the last frame took
+        self.frame_time = 0
+        # snakes move alternately, each half of the move interval (so that they won't move at the same time)
+        self.scheduler = TickScheduler(conf.MOVE_INTERVAL / 2, conf.MAX_TICKS_PER_FRAME, speed)
+        self.player_turn = True
         self.game_is_running = False
-
-        self.grid = None
-        self.player = None
-        self.enemy = None
-        self.food = None
+        # simulation of the game itself, created when the game starts
+        self.engine = None
+        # parts of the screen changed since the last display update
+        self.dirty_rects = []
+        # if set, every finished match is saved as a replay there, numbered (replay_path with _1, _2, ... before the extension)
+        self.replay_path = replay_path
+        self.matches_played = 0
+        # installed profiler, its results are displayed in an overlay below the board
+        self.profiler = profiler
+        # AI of the enemy snake, None for the default one following the shortest path to the food
+        self.enemy_ai = enemy_ai
 
         self.display_main_menu()
 
@@ -35,96 +57,76 @@ class Game:
         """Displays given text on the sceen"""
         # pylint: disable=too-many-arguments
         # In this case removing any arguments would make the function less universal or more complicated
-        pg_font = pygame.font.SysFont(font, font_size)
-        text_to_display = pg_font.render(text, True, color)
-        text_rect = text_to_display.get_rect(center=(pos_vector))
-        self.screen.blit(text_to_display, text_rect)
+        text_to_display = render_text(text, font, font_size, color)
+        text_rect = text_to_display.get_rect(center=pos_vector)
+        self.dirty_rects.append(self.screen.blit(text_to_display, text_rect))
 
     def display_main_menu(self):
         """Displays main menu"""
-        self.disable_timers()
-        self.screen.fill(conf.MENU_BACKGROUND_COLOR)
+        self.dirty_rects.append(self.screen.fill(conf.MENU_BACKGROUND_COLOR))
         self.write_text("Snake Against AI", conf.TITLE_FONT,
-                        conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, conf.TITLE_POS)
+                        conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, self.config.title_pos)
         self.write_text("Press SPACE to play or ESC to exit",
-                        conf.TEXT_FONT, conf.TEXT_FONT_SIZE, conf.TEXT_COLOR, conf.TEXT_POS)
+                        conf.TEXT_FONT, conf.TEXT_FONT_SIZE, conf.TEXT_COLOR, self.config.text_pos)
 
     def start_game(self):
         """Begins the game. Redraws screen with playing board, snakes and food."""
-        self.screen.fill(conf.BACKGROUND_COLOR)
-
         self.game_is_running = True
-        self.grid = Grid()
-        self.player = PlayerSnake(self.grid, self.screen)
-        self.enemy = EnemySnake(self.grid, self.screen)
-        self.food = Food(self.grid, self.screen)
-
-        # timers form moving the snakes
-        pygame.time.set_timer(self.player_update, conf.MOVE_INTERVAL)
-        # offset enemy snake's timer (so that they won't move at the same time)
-        pygame.time.delay(conf.MOVE_INTERVAL // 2)
-        pygame.time.set_timer(self.enemy_update, conf.MOVE_INTERVAL)
-
-    def display_end_screen(self, player_win):
-        """Displays game over screen and if player won"""
+        self.engine = Engine(self.screen, record=self.replay_path is not None, enemy_ai=self.enemy_ai,
+                             config=self.config)
+        self.engine.grid.draw_all(self.screen)
+        self.scheduler.reset()
+        self.player_turn = True
+
+    def display_end_screen(self, winner):
+        """Displays game over screen and if player won (winner is None for a draw)"""
         self.game_is_running = False
-        Food.is_spawned = False
-        self.disable_timers()
-        self.screen.fill(conf.MENU_BACKGROUND_COLOR)
+        self.matches_played += 1
+        if self.engine.recorder is not None:
+            self.engine.recorder.save(numbered_path(self.replay_path, self.matches_played))
+        self.dirty_rects.append(self.screen.fill(conf.MENU_BACKGROUND_COLOR))
 
-        if player_win:
+        if winner == "player":
             self.write_text("YOU WIN", conf.TITLE_FONT,
-                            conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, conf.TITLE_POS)
-        else:
+                            conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, self.config.title_pos)
+        elif winner == "enemy":
             self.write_text("YOU LOSE", conf.TITLE_FONT,
-                            conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, conf.TITLE_POS)
+                            conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, self.config.title_pos)
+        else:
+            self.write_text("DRAW", conf.TITLE_FONT,
+                            conf.TITLE_FONT_SIZE, conf.TITLE_COLOR, self.config.title_pos)
 
         self.write_text("Press SPACE to play or ESC to exit",
-                        conf.TEXT_FONT, conf.TEXT_FONT_SIZE, conf.TEXT_COLOR, conf.TEXT_POS)
+                        conf.TEXT_FONT, conf.TEXT_FONT_SIZE, conf.TEXT_COLOR, self.config.text_pos)
 
     def display_score(self, score, score_pos, color):
         """Displayes player and enemy length"""
-        pg_font = pygame.font.SysFont(conf.TEXT_FONT, conf.SCORE_FONT_SIZE)
         # redraw tile to cover previous score
-        self.grid.get_tile(score_pos).draw(self.screen)
-        text_to_display = pg_font.render(str(score), True, color)
+        self.dirty_rects.append(self.engine.grid.get_tile(score_pos).draw(self.screen))
+        text_to_display = render_text(str(score), conf.TEXT_FONT, conf.SCORE_FONT_SIZE, color)
+        tile_size = self.config.tile_size
         score_world_pos = Vector2(
-            score_pos*conf.TILE_SIZE + Vector2(conf.TILE_SIZE//2, conf.TILE_SIZE//2))
+            score_pos*tile_size + Vector2(tile_size//2, tile_size//2))
         text_rect = text_to_display.get_rect(center=score_world_pos)
-        self.screen.blit(text_to_display, text_rect)
+        self.dirty_rects.append(self.screen.blit(text_to_display, text_rect))
 
     def end_game(self):
         """Quits pygame and the whole program"""
         pygame.quit()
         sys.exit()
 
-    def check_size_diff(self):
-        """If one snake is significantly larger than the other, the bigger one wins"""
-        player_len = self.player.get_snake_len()
-        enemy_len = self.enemy.get_snake_len()
-
-        if enemy_len > player_len + conf.MAX_LEN_DIFF:
-            self.display_end_screen(False)
-        elif enemy_len + conf.MAX_LEN_DIFF < player_len:
-            self.display_end_screen(True)
-
-    def disable_timers(self):
-        """Turns off snake move timers"""
-        pygame.time.set_timer(self.player_update, 0)
-        pygame.time.set_timer(self.enemy_update, 0)
-
     def player_input(self, event):
         """Handles player input"""
         if self.game_is_running:
             # Movement
             if event.key == pygame.K_UP:
-                self.player.change_direction(Vector2(0, -1))
+                self.engine.player.change_direction(Vector2(0, -1))
             elif event.key == pygame.K_DOWN:
-                self.player.change_direction(Vector2(0, 1))
+                self.engine.player.change_direction(Vector2(0, 1))
             elif event.key == pygame.K_RIGHT:
-                self.player.change_direction(Vector2(1, 0))
+                self.engine.player.change_direction(Vector2(1, 0))
             elif event.key == pygame.K_LEFT:
-                self.player.change_direction(Vector2(-1, 0))
+                self.engine.player.change_direction(Vector2(-1, 0))
         else:
             # Menu input
             if event.key == pygame.K_SPACE:
@@ -134,40 +136,65 @@ class Game:
                 self.end_game()
 
     def update_after_snake_move(self):
-        """Updates all things that could change after one of the snakes moved."""
-        self.food.try_to_spawn()
-        self.display_score(self.player.get_snake_len(),
-                           conf.PLAYER_SCORE_POS, conf.PLAYER_COLOR)
-        self.display_score(self.enemy.get_snake_len(),
-                           conf.ENEMY_SCORE_POS, conf.ENEMY_COLOR)
-        self.check_size_diff()
+        """Updates the screen after one of the snakes moved, or ends the game if someone won."""
+        if self.engine.is_over:
+            self.display_end_screen(self.engine.winner)
+            return
+        self.display_score(self.engine.player.get_snake_len(),
+                           self.config.player_score_pos, conf.PLAYER_COLOR)
+        self.display_score(self.engine.enemy.get_snake_len(),
+                           self.config.enemy_score_pos, conf.ENEMY_COLOR)
+
+    def move_snakes(self, ticks):
+        """Moves the snakes alternately given number of times"""
+        for _ in range(ticks):
+            if not self.game_is_running:
+                return
+            if self.player_turn:
+                self.engine.move_player()
+            else:
+                self.engine.move_enemy()
+            self.player_turn = not self.player_turn
+            self.update_after_snake_move()
+
+    def display_profiler_overlay(self):
+        """Displays times measured by the profiler in the panel below the board"""
+        top = self.config.screen_size[1]
+        self.dirty_rects.append(self.screen.fill(conf.OVERLAY_BACKGROUND_COLOR,
+                                                 (0, top, self.screen.get_width(), self.screen.get_height() - top)))
+        # the numbers change every frame, in the render_text cache they would only push out the scores
+        font = get_font(conf.OVERLAY_FONT, conf.OVERLAY_FONT_SIZE)
+        for line in self.profiler.overlay_lines():
+            self.screen.blit(font.render(line, True, conf.TEXT_COLOR), (0, top))
+            top += font.get_linesize()
+
+    def update_display(self):
+        """Pushes only the changed parts of the screen to the display. Skips the frame if nothing changed."""
+        if self.engine is not None:
+            self.dirty_rects.extend(self.engine.grid.dirty_rects)
+            self.engine.grid.dirty_rects.clear()
+        if not self.dirty_rects:
+            return
+        pygame.display.update(self.dirty_rects)
+        self.dirty_rects.clear()
 
     def update(self):
         """
         Checks and updates everything important for the game to run properly.
-        Happens every tick of the clock.
+        Happens every frame, the snakes move as many times as the scheduler says.
         """
         for event in pygame.event.get():
             # Quit button
             if event.type == pygame.QUIT:
                 self.end_game()
 
-            if event.type == self.player_update:
-                # Player lost if he collided (move method returned false)
-                if not self.player.move():
-                    self.display_end_screen(False)
-                    continue
-                self.update_after_snake_move()
-
-            elif event.type == self.enemy_update:
-                # Player wins if enemy colides
-                if not self.enemy.move():
-                    self.display_end_screen(True)
-                    continue
-                self.update_after_snake_move()
-
             if event.type == pygame.KEYDOWN:
                 self.player_input(event)
 
-        pygame.display.update()
-        self.clock.tick(conf.FRAMERATE)
+        if self.game_is_running:
+            self.move_snakes(self.scheduler.advance(self.frame_time))
+        if self.profiler is not None:
+            self.display_profiler_overlay()
+
+        self.update_display()
+        self.frame_time = self.clock.tick(conf.FRAMERATE)
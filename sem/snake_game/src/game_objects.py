@@ -1,47 +1,88 @@
 """Imports"""
-from collections import deque
 import numpy as np
-from pygame.math import Vector2
 
-from src.helpers import out_of_bounds
-from src.config import PLAYER_START_POS, ENEMY_START_POS, GRID_SIZE
+from src.body import SnakeBody
+from src.vector import Vector2
+
+# possible directions of a snake, in the same order as neighbours in pathfinding (up, down, right, left)
+DIRECTIONS = (Vector2(0, -1), Vector2(0, 1), Vector2(1, 0), Vector2(-1, 0))
+# the same directions as integer (dx, dy)
+MOVES = tuple((int(direction.x), int(direction.y)) for direction in DIRECTIONS)
 
 
 class Food:
     """Food that snake can eat and then increase in size"""
 
-    is_spawned = False
-    pos = Vector2(0, 0)
-
-    def __init__(self, grid, screen):
+    def __init__(self, grid, screen, rng=None):
         self.grid = grid
         self.screen = screen
-        self.try_to_spawn()
+        # random generator of the game, food positions are reproducible with a seeded one
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.is_spawned = False
+        self.pos = Vector2(0, 0)
+
+    def is_eaten(self):
+        """Returns true if a snake moved over the spawned food"""
+        return self.is_spawned and self.grid.get_type(self.pos) != "food"
 
     def try_to_spawn(self):
-        """If food is not already spawned, spawn it on randomly (create and display it on the screen)"""
-        while not Food.is_spawned:
-            x = np.random.randint(0, GRID_SIZE)
-            y = np.random.randint(0, GRID_SIZE)
-            if self.grid.get_tile(Vector2(x, y)).walkable:
-                Food.is_spawned = True
-                Food.pos = Vector2(x, y)
-                self.grid.change_tile("food", Food.pos, self.screen)
+        """
+        If food is not already spawned (or was eaten), spawn it on randomly (create and display it on the screen).
+        Returns false if there is no empty tile left for the food.
+        """
+        if self.is_eaten():
+            self.is_spawned = False
+        if self.is_spawned:
+            return True
+        pos = self.grid.random_free_cell(self.rng)
+        if pos is None:
+            return False
+        self.is_spawned = True
+        self.pos = pos
+        self.grid.change_tile("food", self.pos, self.screen)
+        return True
 
     def get_pos(self):
         """Returns position of the food"""
         return self.pos
 
+    def snapshot(self):
+        """Returns state of the food including its random generator, for restore"""
+        return self.is_spawned, Vector2(self.pos), self.rng.bit_generator.state
+
+    def restore(self, snapshot):
+        """Returns the food to the state from the snapshot (the tile itself is restored by the grid)"""
+        self.is_spawned, pos, self.rng.bit_generator.state = snapshot
+        self.pos = Vector2(pos)
+
 
 class Snake:
     """Base snake class"""
 
-    def __init__(self, grid, screen):
+    # pylint: disable=too-many-instance-attributes
+    # Besides its body and direction, the snake keeps references to the board, its own id, the move log
+    # and its cached path to the food, so 11 attributes are reasonable.
+
+    def __init__(self, grid, screen, food, tile_type, snake_id):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Tile type and id tell the snakes on the board apart, both are needed.
+        # id of the snake, stored in the grid as owner of the tiles of its body
+        self.snake_id = snake_id
+        self.tile_type = tile_type
         self.direction = Vector2(1, 0)
         self.last_direction = self.direction
         self.grid = grid
+        # screen can be None, then the snake is simulated without drawing
         self.screen = screen
-        self.body = deque()
+        self.food = food
+        # cell indices of the body, from the tail to the head
+        self.body = SnakeBody(grid.config)
+        # tail cells freed by the moves since the first checkpoint (None if the tail stayed), None when moves aren't logged
+        self.journal = None
+        # cached rest of the path to the food (cell indices, next step is the last item)
+        self.path = []
+        # cell index of the food the cached path leads to
+        self.path_target = None
 
     def get_snake_len(self):
         """Returns number of tiles the snake is made of"""
@@ -54,106 +95,151 @@ class Snake:
             return
         self.direction = new_direction
 
-
-class PlayerSnake(Snake):
-    """Snake controlled by the player"""
-
-    def __init__(self, grid, screen):
-        Snake.__init__(self, grid, screen)
-        self.body.append(PLAYER_START_POS)
-        self.grid.change_tile("player", PLAYER_START_POS, self.screen)
-
-    def move(self):
+    def advance(self):
         """
-        Moves the snake in a direction that the snake currently has.
+        Moves the snake by one tile in its current direction.
         Returns true if the move is ok, and false if snake died during that move.
         """
-        # crete new snake piece in the place he moved to
-        new_snake_piece = self.body[-1] + self.direction
+        # padded index of the cell the head moves to, the border of the padded board isn't walkable
+        config = self.grid.config
+        target = config.padded_cells[self.body.head] + int(self.direction.x) + int(self.direction.y) * config.padded_size
         self.last_direction = self.direction
-        self.body.append(new_snake_piece)
 
-        # snake moved out of bounds
-        if out_of_bounds(new_snake_piece):
+        # check for collision (or moving out of bounds)
+        if not self.grid.padded_walkable[target]:
             return False
+        cell = config.unpadded_cells[target]
 
-        tile_under_head = self.grid.get_tile(new_snake_piece)
-
-        # check for collision
-        if not tile_under_head.walkable:
-            return False
+        # check for food (food notices it was eaten when the head covers it)
+        has_eaten = cell in self.grid.food_cells
 
-        # check for food
-        has_eaten = False
-        if tile_under_head.type == "food":
-            has_eaten = True
-            Food.is_spawned = False
+        # crete new snake piece in the place he moved to
+        self.body.append(cell)
+        self.grid.change_cell(self.tile_type, cell, self.screen, owner=self.snake_id)
+        if self.journal is not None:
+            self.journal.append(None)
 
-        #change in grid
-        self.grid.change_tile("player", new_snake_piece, self.screen)
+        # remove last snake piece if no food was consumed
         if not has_eaten:
             to_delete = self.body.popleft()
-            self.grid.change_tile("nothing", to_delete, self.screen)
+            self.grid.change_cell("nothing", to_delete, self.screen)
+            if self.journal is not None:
+                self.journal[-1] = to_delete
 
         return True  # move succesful
 
+    def checkpoint(self):
+        """
+        Starts logging moves of the snake (if not yet logged) and returns a point to undo to.
+        Tiles of the body are restored by the grid, so grid has to be undone to its checkpoint as well.
+        """
+        if self.journal is None:
+            self.journal = []
+        return len(self.journal), Vector2(self.direction), Vector2(self.last_direction)
+
+    def undo(self, checkpoint):
+        """Reverts the body and direction to the checkpoint, in O(moves made since then)"""
+        length, self.direction, self.last_direction = checkpoint
+        # the cached path continues from the head the snake had before the undo
+        self.path = []
+        while len(self.journal) > length:
+            tail = self.journal.pop()
+            self.body.pop()
+            if tail is not None:
+                self.body.appendleft(tail)
+
+    def end_journal(self):
+        """Stops logging moves of the snake, they can't be undone anymore"""
+        self.journal = None
+
+    def cached_path_valid(self, target):
+        """
+        Returns true if the cached path still leads to the target and isn't blocked.
+        Only cells of the path can block it, so only those are checked.
+        """
+        if not self.path or self.path_target != target:
+            return False
+        walkable = self.grid.walkable_cells
+        for idx in self.path:
+            if not walkable[idx]:
+                return False
+        return True
+
+    def next_step(self):
+        """Returns cell index of the next step on the path to the food, or None if there is no path"""
+        target = self.grid.config.cell_index(self.food.pos)
+        if not self.cached_path_valid(target):
+            # replan only when the food moved or the path got blocked
+            path = self.grid.shortest_path_cells(self.body.head, target)
+            self.path = path[:0:-1] if path else []
+            self.path_target = target
+        if not self.path:
+            return None
+        return self.path.pop()
+
+    def steer_by_field(self, field):
+        """
+        Turns the snake to the neighbouring tile closest to the food according to the distance field
+        (shared by all snakes of the tick). Keeps the direction if every neighbour is blocked.
+        """
+        config = self.grid.config
+        head = config.padded_cells[self.body.head]
+        back = -int(self.last_direction.x) - int(self.last_direction.y) * config.padded_size
+        walkable = self.grid.padded_walkable
+        unpadded_cells = config.unpadded_cells
+        best = None
+        for direction, offset in zip(DIRECTIONS, config.padded_offsets):
+            if offset == back or not walkable[head + offset]:
+                continue
+            distance = field[unpadded_cells[head + offset]]
+            if best is None or distance < best:
+                best = distance
+                self.direction = direction
+
+    def steer_to_food(self):
+        """Turns the snake along the shortest path to the food. Keeps the direction if there is no path."""
+        next_cell = self.next_step()
+        if next_cell is not None:
+            self.direction = self.grid.config.cell_pos(next_cell) - self.grid.config.cell_pos(self.body.head)
 
-class EnemySnake(Snake):
-    """Snake controlled by the computer."""
-
-    def __init__(self, grid, screen):
-        Snake.__init__(self, grid, screen)
-        self.direction = Vector2(-1, 0)
-        self.body.append(ENEMY_START_POS)
-        self.grid.change_tile("enemy", ENEMY_START_POS, self.screen)
-
-    def move(self):
-        """Move enemy snake in direction of the shortest path to the food."""
-        head = self.body[-1]
-
-        def dir_to_neigbour(neighbour):
-            """Returns a direction to a given neighbouring Tile"""
-            if neighbour == head + Vector2(1, 0):
-                return Vector2(1, 0)
-            if neighbour == head + Vector2(-1, 0):
-                return Vector2(-1, 0)
-            if neighbour == head + Vector2(0, 1):
-                return Vector2(0, 1)
-            if neighbour == head + Vector2(0, -1):
-                return Vector2(0, -1)
-            raise Exception("Given point isn't a neighbour")
-
-        # try to find shortest path to the food
-        path = self.grid.shortest_path(head, Food.pos)
-        if path:
-            self.direction = dir_to_neigbour(path[1])
-        # Create new snake piece in the direction of movement
-        new_snake_piece = head + self.direction
-        self.last_direction = self.direction
-        self.body.append(new_snake_piece)
 
-        # snake moved out of bounds
-        if out_of_bounds(new_snake_piece):
-            return False
+class PlayerSnake(Snake):
+    """Snake controlled by the player"""
 
-        tile_under_head = self.grid.get_tile(new_snake_piece)
+    def __init__(self, grid, screen, food, snake_id=0):
+        Snake.__init__(self, grid, screen, food, "player", snake_id)
+        start_pos = grid.config.player_start_pos
+        self.body.append(grid.config.cell_index(start_pos))
+        self.grid.change_tile("player", start_pos, self.screen, owner=self.snake_id)
 
-        # check for collision
-        if not tile_under_head.walkable:
-            return False
+    def move(self):
+        """
+        Moves the snake in a direction that the snake currently has.
+        Returns true if the move is ok, and false if snake died during that move.
+        """
+        return self.advance()
 
-        # check for food
-        has_eaten = False
-        if tile_under_head.type == "food":
-            has_eaten = True
-            Food.is_spawned = False
 
-        #change in grid
-        self.grid.change_tile("enemy", new_snake_piece, self.screen)
+class EnemySnake(Snake):
+    """Snake controlled by the computer."""
 
-        # remove last snake piece if no food was consumed
-        if not has_eaten:
-            to_delete = self.body.popleft()
-            self.grid.change_tile("nothing", to_delete, self.screen)
+    def __init__(self, grid, screen, food, snake_id=1, start_pos=None, ai=None):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Start position and id are needed only when there are more enemy snakes on the board.
+        Snake.__init__(self, grid, screen, food, "enemy", snake_id)
+        if start_pos is None:
+            start_pos = grid.config.enemy_start_pos
+        # optional AI choosing the moves (lookahead.LookaheadAI), the snake follows its path to the food without it
+        self.ai = ai
+        self.direction = self.last_direction = Vector2(-1, 0)
+        self.body.append(grid.config.cell_index(start_pos))
+        self.grid.change_tile("enemy", start_pos, self.screen, owner=self.snake_id)
 
-        return True  # move succesful
+    def move(self):
+        """Move enemy snake in direction chosen by its AI, or of the shortest path to the food."""
+        if self.ai is not None:
+            self.direction = self.ai.choose_direction(self)
+        else:
+            # try to follow shortest path to the food
+            self.steer_to_food()
+        return self.advance()
@@ -1,126 +1,339 @@
 """Imports"""
-from queue import PriorityQueue
+from functools import lru_cache
+
 import numpy as np
-import pygame
-from pygame.math import Vector2
 
-from src.config import TILE_SIZE, BACKGROUND_COLOR, ENEMY_COLOR, PLAYER_COLOR, FOOD_COLOR, GRID_SIZE
-from src.helpers import distance, out_of_bounds
+from src.config import BACKGROUND_COLOR, ENEMY_COLOR, PLAYER_COLOR, FOOD_COLOR, DEFAULT_CONFIG
+from src.helpers import out_of_bounds
+from src.pathfinding import PathFinder, DistanceField
+from src.vector import Vector2
+
+
+# tile types are stored in the grid as small integer codes (index into this tuple)
+TILE_TYPES = ("nothing", "player", "enemy", "food")
+TILE_CODES = {tile_type: code for code, tile_type in enumerate(TILE_TYPES)}
+NOTHING = TILE_CODES["nothing"]
+FOOD = TILE_CODES["food"]
+# snakes can't move through tiles occupied by another snake
+WALKABLE_CODES = np.array([tile_type not in ("player", "enemy")
+                           for tile_type in TILE_TYPES], dtype=bool)
+WALKABLE_FLAGS = tuple(int(walkable) for walkable in WALKABLE_CODES)
+TILE_COLORS = (BACKGROUND_COLOR, PLAYER_COLOR, ENEMY_COLOR, FOOD_COLOR)
+
+
+def prepare_surface(surface):
+    """Converts surface to the pixel format of the display (if there is one), so it is blitted faster"""
+    # only drawing needs pygame, boards simulated without a screen (workers, servers) don't import it at all
+    import pygame  # pylint: disable=import-outside-toplevel
+
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert()
+    return surface
+
+
+@lru_cache(maxsize=None)
+def tile_sprites(tile_size):
+    """Returns pre-rendered surface of a tile of given size for every tile type code"""
+    # imported here, see prepare_surface
+    import pygame  # pylint: disable=import-outside-toplevel
+
+    sprites = []
+    for color in TILE_COLORS:
+        sprite = pygame.Surface((tile_size - 2, tile_size - 2))
+        sprite.fill(color)
+        sprites.append(prepare_surface(sprite))
+    return tuple(sprites)
+
+
+@lru_cache(maxsize=None)
+def board_background(config):
+    """Returns pre-rendered surface of the whole board (given by its config) with only empty tiles"""
+    # imported here, see prepare_surface
+    import pygame  # pylint: disable=import-outside-toplevel
+
+    background = pygame.Surface(config.screen_size)
+    background.fill(BACKGROUND_COLOR)
+    empty = tile_sprites(config.tile_size)[NOTHING]
+    background.blits([(empty, offset) for offset in config.pixel_offsets], doreturn=False)
+    return prepare_surface(background)
 
 
 class TILE:
-    """Class representing single tile on the grid"""
+    """
+    View of a single tile on the grid.
+    The tile state itself is stored in the arrays of the grid.
+    """
+
+    __slots__ = ("grid", "grid_x", "grid_y")
 
-    def __init__(self, grid_x, grid_y, screen_pos, tile_type):
+    def __init__(self, grid, grid_x, grid_y):
+        self.grid = grid
         self.grid_x = grid_x
         self.grid_y = grid_y
-        # position in pixels
-        self.screen_pos = screen_pos
-        self.change_type(tile_type)
+
+    @property
+    def type(self):
+        """Type of this tile"""
+        return TILE_TYPES[self.grid.types[self.grid_y, self.grid_x]]
+
+    @property
+    def walkable(self):
+        """True if snake can move on this tile"""
+        return bool(self.grid.walkable[self.grid_y, self.grid_x])
+
+    @property
+    def screen_pos(self):
+        """Position of the tile in pixels"""
+        tile_size = self.grid.config.tile_size
+        return Vector2(self.grid_x * tile_size, self.grid_y * tile_size)
 
     def draw(self, screen):
-        """Display this tile on the screen"""
-        rect = pygame.Rect(self.screen_pos.x, self.screen_pos.y,
-                           TILE_SIZE - 2, TILE_SIZE - 2)
-        color = BACKGROUND_COLOR
-        if self.type == "enemy":
-            color = ENEMY_COLOR
-        elif self.type == 'player':
-            color = PLAYER_COLOR
-        elif self. type == 'food':
-            color = FOOD_COLOR
-
-        pygame.draw.rect(screen, color, rect)
+        """Display this tile on the screen. Returns the rectangle of the screen that changed."""
+        tile_size = self.grid.config.tile_size
+        sprite = tile_sprites(tile_size)[self.grid.types[self.grid_y, self.grid_x]]
+        return screen.blit(sprite, (self.grid_x * tile_size, self.grid_y * tile_size))
 
     def change_type(self, new_type):
         """Change the type of this tile"""
-        self.type = new_type
-        if new_type in ('player', 'enemy'):
-            self.walkable = False
-        else:
-            self.walkable = True
+        self.grid.set_type(self.grid_x, self.grid_y, TILE_CODES[new_type])
 
 
 class Grid:
-    """Class representing the whole playing bord. Divided into Tiles"""
+    """
+    Class representing the whole playing bord. Divided into Tiles.
+    Tile types are stored as an array of type codes together with a mask of walkable tiles.
+    """
+
+    # pylint: disable=too-many-instance-attributes,too-many-public-methods
+    # Besides the tile types, the grid keeps indices of the tiles needed by the snakes and the food,
+    # and logs of the changes for undo and for sending the board over the network.
+
+    def __init__(self, config=DEFAULT_CONFIG):
+        # size of the board and the values derived from it (config.BoardConfig)
+        self.config = config
+        size = config.grid_size
+        self.types = np.zeros((size, size), dtype=np.uint8)
+        # the walkable mask is a numpy view of a flat bytearray,
+        # which can be indexed quickly from pure python loops (pathfinding)
+        self.walkable_cells = bytearray(b"\x01" * config.cells)
+        self.walkable = np.frombuffer(self.walkable_cells, dtype=bool).reshape(size, size)
+        # walkable flags indexed by padded index (config.padded_cells), the border is never walkable
+        self.padded_walkable = bytearray(config.padded_size * config.padded_size)
+        for padded in config.padded_cells:
+            self.padded_walkable[padded] = 1
+        # id of the snake occupying each tile (-1 for tiles without snake)
+        self.owners = np.full((size, size), -1, dtype=np.int16)
+        self.pathfinder = PathFinder(size)
+        # distances to the nearest food shared by the snakes of an arena tick, updated only around the changed tiles
+        self.food_field = DistanceField(size)
+        self.food_cells = set()
+        # indices (y * size + x) of empty tiles, removed by swapping with the last item,
+        # so that a random empty tile can be picked in constant time
+        self.free_cells = list(range(config.cells))
+        # position of every cell in free_cells (-1 if the tile isn't empty)
+        self.free_slots = list(range(config.cells))
+        # parts of the screen drawn since the display was last updated
+        self.dirty_rects = []
+        # previous (cell index, type code, owner, slot in free_cells) of every changed tile
+        # since the first checkpoint, None when changes aren't recorded
+        self.journal = None
+        # indices of the tiles changed since the log was last drained, None when changes aren't logged
+        self.changed = None
+
+    def copy(self):
+        """
+        Returns independent copy of the board (without drawing state), for simulations ahead.
+        Only flat arrays are copied, the pathfinder with its scratch arrays is shared.
+        """
+        grid = Grid.__new__(Grid)
+        grid.config = self.config
+        grid.types = self.types.copy()
+        grid.walkable_cells = bytearray(self.walkable_cells)
+        grid.walkable = np.frombuffer(grid.walkable_cells, dtype=bool).reshape(self.types.shape)
+        grid.padded_walkable = bytearray(self.padded_walkable)
+        grid.owners = self.owners.copy()
+        grid.pathfinder = self.pathfinder
+        grid.food_field = DistanceField(self.config.grid_size)
+        grid.food_cells = set(self.food_cells)
+        grid.free_cells = list(self.free_cells)
+        grid.free_slots = list(self.free_slots)
+        grid.dirty_rects = []
+        grid.journal = None
+        grid.changed = None
+        return grid
 
-    # Creates numpy 2D array and fills it with tiles
-    def __init__(self):
-        self.grid = np.empty((GRID_SIZE, GRID_SIZE), dtype=object)
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                self.grid[y, x] = TILE(grid_x=x, grid_y=y, screen_pos=Vector2(
-                    x * TILE_SIZE, y * TILE_SIZE), tile_type='nothing')
+    def checkpoint(self):
+        """Starts recording changes of the board (if not yet recorded) and returns a point to undo to"""
+        if self.journal is None:
+            self.journal = []
+        return len(self.journal)
+
+    def undo(self, checkpoint):
+        """
+        Reverts all changes made after the checkpoint, in O(changed tiles).
+        The index of empty tiles is restored exactly, so that random food spawns stay the same.
+        """
+        journal = self.journal
+        size = self.config.grid_size
+        padded_cells = self.config.padded_cells
+        while len(journal) > checkpoint:
+            idx, code, owner, slot = journal.pop()
+            y, x = divmod(idx, size)
+            was_free, is_free = slot >= 0, self.free_slots[idx] >= 0
+            if was_free and not is_free:
+                # inverse of remove_free_cell, the tile goes back to its slot
+                if slot < len(self.free_cells):
+                    last = self.free_cells[slot]
+                    self.free_slots[last] = len(self.free_cells)
+                    self.free_cells.append(last)
+                    self.free_cells[slot] = idx
+                else:
+                    self.free_cells.append(idx)
+                self.free_slots[idx] = slot
+            elif is_free and not was_free:
+                # inverse of add_free_cell, the tile was appended
+                self.free_cells.pop()
+                self.free_slots[idx] = -1
+            self.types[y, x] = code
+            self.walkable[y, x] = WALKABLE_CODES[code]
+            self.padded_walkable[padded_cells[idx]] = WALKABLE_FLAGS[code]
+            self.owners[y, x] = owner
+            if code == FOOD:
+                self.food_cells.add(idx)
+            else:
+                self.food_cells.discard(idx)
+            self.food_field.mark(idx)
+            if self.changed is not None:
+                self.changed.add(idx)
+
+    def end_journal(self):
+        """Stops recording changes of the board, they can't be undone anymore"""
+        self.journal = None
+
+    def log_changes(self):
+        """Starts logging indices of changed tiles, independently of the journal (and its checkpoints)"""
+        if self.changed is None:
+            self.changed = set()
+
+    def drain_changes(self):
+        """Returns sorted indices of the tiles changed since the last drain and empties the log"""
+        changed = sorted(self.changed)
+        self.changed.clear()
+        return changed
 
     def draw_all(self, screen):
-        """Displays whole grid on the screen"""
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                self.grid[y, x].draw(screen)
+        """Displays whole grid on the screen. Only tiles which aren't empty are drawn over the background."""
+        self.dirty_rects.append(screen.blit(board_background(self.config), (0, 0)))
+        sprites = tile_sprites(self.config.tile_size)
+        pixel_offsets = self.config.pixel_offsets
+        occupied = np.flatnonzero(self.types)
+        screen.blits([(sprites[self.types.flat[idx]], pixel_offsets[idx]) for idx in occupied], doreturn=False)
 
-    def change_tile(self, new_tile_type, pos, screen, draw=True):
-        """Changes tile on a given position and displays it on the screen"""
-        self.grid[int(pos.y), int(pos.x)].change_type(new_tile_type)
-        if draw:
-            self.grid[int(pos.y), int(pos.x)].draw(screen)
+    def set_type(self, x, y, code, owner=-1):
+        """Sets type code (and the owner snake) of a tile on given integer coordinates"""
+        idx = y * self.config.grid_size + x
+        if self.journal is not None:
+            self.journal.append((idx, int(self.types[y, x]), int(self.owners[y, x]), self.free_slots[idx]))
+        was_free = self.types[y, x] == NOTHING
+        self.types[y, x] = code
+        self.walkable[y, x] = WALKABLE_CODES[code]
+        self.owners[y, x] = owner
+        self.padded_walkable[self.config.padded_cells[idx]] = WALKABLE_FLAGS[code]
+        if was_free and code != NOTHING:
+            self.remove_free_cell(idx)
+        elif not was_free and code == NOTHING:
+            self.add_free_cell(idx)
+        if code == FOOD:
+            self.food_cells.add(idx)
+        else:
+            self.food_cells.discard(idx)
+        self.food_field.mark(idx)
+        if self.changed is not None:
+            self.changed.add(idx)
+
+    def add_free_cell(self, idx):
+        """Adds cell to the index of empty tiles"""
+        self.free_slots[idx] = len(self.free_cells)
+        self.free_cells.append(idx)
+
+    def remove_free_cell(self, idx):
+        """Removes cell from the index of empty tiles (swaps it with the last one)"""
+        slot = self.free_slots[idx]
+        last = self.free_cells.pop()
+        if last != idx:
+            self.free_cells[slot] = last
+            self.free_slots[last] = slot
+        self.free_slots[idx] = -1
+
+    def random_free_cell(self, rng):
+        """Returns position of a random empty tile, or None if the whole board is full"""
+        if not self.free_cells:
+            return None
+        return self.config.cell_pos(self.free_cells[int(rng.integers(len(self.free_cells)))])
+
+    def change_tile(self, new_tile_type, pos, screen, draw=True, owner=-1):
+        """
+        Changes tile on a given position and displays it on the screen.
+        Nothing is drawn when screen is None (headless simulation).
+        Snake tiles also store id of the snake as their owner.
+        """
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Owner is needed only for snake tiles, the other arguments are the original interface.
+        x, y = int(pos.x), int(pos.y)
+        self.set_type(x, y, TILE_CODES[new_tile_type], owner)
+        if draw and screen is not None:
+            self.dirty_rects.append(TILE(self, x, y).draw(screen))
+
+    def change_cell(self, new_tile_type, idx, screen, owner=-1):
+        """Same as change_tile, for a cell index (y * grid size + x)"""
+        y, x = divmod(idx, self.config.grid_size)
+        self.set_type(x, y, TILE_CODES[new_tile_type], owner)
+        if screen is not None:
+            self.dirty_rects.append(TILE(self, x, y).draw(screen))
 
     def get_tile(self, pos):
         """Returns tile at given position"""
-        return self.grid[int(pos.y), int(pos.x)]
+        return TILE(self, int(pos.x), int(pos.y))
+
+    def get_owner(self, pos):
+        """Returns id of the snake on given position (-1 if there is no snake)"""
+        return int(self.owners[int(pos.y), int(pos.x)])
+
+    def get_type(self, pos):
+        """Returns type of the tile at given position"""
+        return TILE_TYPES[self.types[int(pos.y), int(pos.x)]]
+
+    def is_walkable(self, pos):
+        """Returns true if a snake can move on tile at given position"""
+        return bool(self.walkable[int(pos.y), int(pos.x)])
 
     def get_walkable_neighbours(self, pos):
         """Returns list of all walkable neigbours (neigbouring tiles in four directions)"""
         neigbhours = []
         for n in [pos + Vector2(0, -1), pos + Vector2(0, 1), pos + Vector2(1, 0), pos + Vector2(-1, 0)]:
-            if not out_of_bounds(n) and self.get_tile(n).walkable:
+            if not out_of_bounds(n, self.config) and self.walkable[int(n.y), int(n.x)]:
                 neigbhours.append(n)
         return neigbhours
 
+    def food_distances(self):
+        """
+        Returns distances (indexed by y * grid size + x) from every tile to the nearest food.
+        The field is brought up to date once per change of the board, so all snakes of an arena tick can share it.
+        Only the arena reads it: the single enemy follows its cached A* path and the lookahead AI rates moves
+        by Manhattan distance to the food.
+        """
+        return self.food_field.update(self.walkable_cells, self.food_cells)
+
     def shortest_path(self, start, end):
         """
         Returns list of positions representing the shortest path between two points.
         The pathfinding is done using A* algorithm.
         """
-        def reconstruct_path(predecessor_list, end):
-            """Reconstructs path from predecessor list"""
-            current = end
-            path = []
-            while current:
-                path.append(Vector2(current))
-                current = predecessor_list[current]
-            path.reverse()
-            return path
-
-        start_tuple = (start.x, start.y)
-        end_tuple = (end.x, end.y)
-        # structure storing f_costs (manhatten distances from start to end)
-        open_q = PriorityQueue()
-        predecessors = {}
-        # dict storing distances from the start
-        g_cost_at = {}
-        # the distance here doesn't matter, it will be the first tile examined anyways
-        open_q.put((0, start_tuple))
-        # predecessor of first tile doesn't exist
-        predecessors[start_tuple] = None
-        g_cost_at[start_tuple] = 0
-
-        while not open_q.empty():
-            # coordinates of tile with lowes f_cost
-            current = open_q.get()[1]
-
-            if current == end_tuple:
-                return reconstruct_path(predecessors, end_tuple)
-
-            for n in self.get_walkable_neighbours(Vector2(current)):
-                # distance to a neigbour is allways 1
-                new_g_cost = g_cost_at[current] + 1
-                # if neighbour was not yet discovered or if we found a shorter path
-                if (n.x, n.y) not in g_cost_at or new_g_cost < g_cost_at[(n.x, n.y)]:
-                    # calulate new distances and add to queue, assign predecessor
-                    g_cost_at[(n.x, n.y)] = new_g_cost
-                    f_cost = new_g_cost + distance(n, end)
-                    open_q.put((f_cost, (n.x, n.y)))
-                    predecessors[(n.x, n.y)] = current
-
-        # in this case path does not exist
-        return None
+        path = self.shortest_path_cells(self.config.cell_index(start), self.config.cell_index(end))
+        if path is None:
+            return None
+        return [self.config.cell_pos(idx) for idx in path]
+
+    def shortest_path_cells(self, start, end):
+        """Same as shortest_path, but for cell indices (y * grid size + x)"""
+        return self.pathfinder.shortest_path(self.walkable_cells, start, end)
@@ -1,14 +1,44 @@
 "Imports"
-from src.config import GRID_SIZE
+import numpy as np
 
+from src.config import DEFAULT_CONFIG
 
-def out_of_bounds(vector):
+# Functions work on the default board unless they get config of another one (config.BoardConfig).
+# Padded indices are described there.
+
+
+def out_of_bounds(vector, config=DEFAULT_CONFIG):
     """Checks if point is outside of playing grid"""
-    if vector.x >= GRID_SIZE or vector.y >= GRID_SIZE or vector.x < 0 or vector.y < 0:
-        return True
-    return False
+    size = config.grid_size
+    return not (0 <= vector.x < size and 0 <= vector.y < size)
 
 
 def distance(a, b):
     """Returns manhatten distance between two vectors"""
     return abs(a.x - b.x) + abs(a.y - b.y)
+
+
+def padded_index(x, y, config=DEFAULT_CONFIG):
+    """Returns padded index of integer coordinates (the border is at -1 and grid size)"""
+    return (y + 1) * config.padded_size + x + 1
+
+
+def out_of_bounds_index(padded, config=DEFAULT_CONFIG):
+    """Checks if padded index is on the border outside of playing grid"""
+    return config.unpadded_cells[padded] < 0
+
+
+def distance_index(a, b, config=DEFAULT_CONFIG):
+    """Returns manhatten distance between two padded indices"""
+    return abs(config.padded_x[a] - config.padded_x[b]) + abs(config.padded_y[a] - config.padded_y[b])
+
+
+def out_of_bounds_batch(positions, config=DEFAULT_CONFIG):
+    """Checks which of the points (integer array with x, y in the last axis) are outside of playing grid"""
+    positions = np.asarray(positions)
+    return ((positions < 0) | (positions >= config.grid_size)).any(axis=-1)
+
+
+def distance_batch(a, b):
+    """Returns manhatten distances between arrays of points (x, y in the last axis), broadcasted against each other"""
+    return np.abs(np.asarray(a) - np.asarray(b)).sum(axis=-1)
@@ -0,0 +1,202 @@
+"""Imports"""
+import time
+
+from src.body import SnakeBody
+from src.config import AI_TIME_BUDGET, AI_MAX_DEPTH
+from src.game_objects import MOVES
+from src.grid import FOOD, TILE_CODES
+from src.vector import Vector2
+
+# space the snake needs (as multiple of its length), more space doesn't outweigh getting closer to the food
+SAFE_SPACE = 2
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the deadline of the move passed"""
+
+
+def territory(walkable, start, rivals, limit, neighbours, deadline=None):
+    """
+    Returns number of walkable cells the snake at start reaches before any of the rivals (heads of other snakes),
+    counting stops at the limit. Rivals move first, so they get the cells reached at the same time.
+    Neighbours is the neighbour table of the board (config.BoardConfig.neighbours).
+    Raises SearchTimeout if the deadline (time.perf_counter value) passes before the counting ends.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    # The deadline is optional, the rest describes the board and the snakes on it.
+    claimed = set(rivals)
+    claimed.add(start)
+    mine = [start]
+    theirs = list(rivals)
+    count = 0
+    while mine and count < limit:
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout
+        next_theirs = []
+        for current in theirs:
+            for n in neighbours[current]:
+                if walkable[n] and n not in claimed:
+                    claimed.add(n)
+                    next_theirs.append(n)
+        theirs = next_theirs
+        next_mine = []
+        for current in mine:
+            for n in neighbours[current]:
+                if walkable[n] and n not in claimed:
+                    claimed.add(n)
+                    next_mine.append(n)
+        count += len(next_mine)
+        mine = next_mine
+    return min(count, limit)
+
+
+def food_distance(cell, food_cells, size):
+    """Returns Manhattan distance from the cell to the nearest food (0 if there is no food)"""
+    y, x = divmod(cell, size)
+    return min((abs(x - food % size) + abs(y - food // size) for food in food_cells), default=0)
+
+
+class LookaheadAI:
+    """
+    Stronger AI for a snake. Searches the snake's own moves ahead on a copy of the board
+    (changes are undone through the grid journal) and rates the reached positions by the space
+    the snake gets to before its opponents. Search is deepened iteratively until the time budget of the move runs out,
+    the deepest fully searched level decides, so the move never takes longer than the budget.
+    Bodies of other snakes are treated as standing still, their heads only claim the space they get to first.
+    """
+
+    def __init__(self, time_budget=AI_TIME_BUDGET, max_depth=AI_MAX_DEPTH):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.deadline = 0.0
+        # depth of the last fully searched level of the last move
+        self.last_depth = 0
+        # other snakes on the board, set by the game
+        self.opponents = []
+
+    def choose_direction(self, snake):
+        """Returns direction for the next move of the snake"""
+        self.deadline = time.perf_counter() + self.time_budget
+        grid = snake.grid
+        board = grid.copy()
+        # simulated copy of the body
+        body = SnakeBody(grid.config)
+        for cell in snake.body.iter_cells():
+            body.append(cell)
+        last_move = (int(snake.last_direction.x), int(snake.last_direction.y))
+        code = TILE_CODES[snake.tile_type]
+        roots = self.candidate_moves(board, body.head, last_move)
+        if not roots:
+            return snake.direction
+
+        size = grid.config.grid_size
+        closest = min(roots, key=lambda root: food_distance(root[1], grid.food_cells, size))[0]
+        rivals = [other.body.head for other in self.opponents if other.body]
+        try:
+            spaces = {move: self.space_after(board, body, cell, code, rivals) for move, cell in roots}
+        except SearchTimeout:
+            # not even the space around the moves fit into the budget, at least avoid the collision
+            return Vector2(closest)
+        # moves surviving equally long are rated by (space up to what the snake needs, closeness of food)
+        best = self.deepen(board, body, roots, code,
+                           lambda move, cell: (spaces[move], -food_distance(cell, grid.food_cells, size)))
+        return Vector2(closest if best is None else best)
+
+    def deepen(self, board, body, roots, code, rate):
+        """
+        Searches the root moves deeper and deeper until the deadline, returns the best move
+        of the deepest fully searched level (None if there is none).
+        Moves are compared by the number of moves survived and then by the rating.
+        """
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # The search state is passed explicitly, so that nothing has to be copied between the levels.
+        best = None
+        self.last_depth = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                scores = {move: (self.search(board, body, move, cell, code, depth), *rate(move, cell))
+                          for move, cell in roots}
+            except SearchTimeout:
+                # the board was restored while the search unwound
+                break
+            best = max(scores, key=scores.get)
+            self.last_depth = depth
+            # deeper search can't change anything if no move survives
+            if scores[best][0] < depth:
+                break
+        return best
+
+    @staticmethod
+    def candidate_moves(board, head, last_move):
+        """Returns list of (move, cell) the snake can make from the head without colliding right away"""
+        back = (-last_move[0], -last_move[1])
+        config = board.config
+        head = config.padded_cells[head]
+        candidates = []
+        for move, offset in zip(MOVES, config.padded_offsets):
+            if move != back and board.padded_walkable[head + offset]:
+                candidates.append((move, config.unpadded_cells[head + offset]))
+        return candidates
+
+    @staticmethod
+    def make_move(board, body, cell, code):
+        """Moves the simulated snake body to the cell, returns the tail which was freed (None if it grew)"""
+        size = board.config.grid_size
+        grows = board.types.flat[cell] == FOOD
+        board.set_type(cell % size, cell // size, code)
+        body.append(cell)
+        if grows:
+            return None
+        tail = body.popleft()
+        board.set_type(tail % size, tail // size, 0)
+        return tail
+
+    @staticmethod
+    def unmake_move(board, body, tail, checkpoint):
+        """Reverts make_move"""
+        body.pop()
+        if tail is not None:
+            body.appendleft(tail)
+        board.undo(checkpoint)
+
+    def space_after(self, board, body, cell, code, rivals):
+        """
+        Returns space (up to what the snake needs) the snake gets to before the rivals after moving to the cell.
+        Raises SearchTimeout once the deadline passed, the board is restored anyway.
+        """
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # The search state is passed explicitly, so that nothing has to be copied between the levels.
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        checkpoint = board.checkpoint()
+        tail = self.make_move(board, body, cell, code)
+        try:
+            # more space than the snake needs doesn't count, so the counting stops there
+            return territory(board.walkable_cells, cell, rivals, SAFE_SPACE * len(body), board.config.neighbours,
+                             self.deadline)
+        finally:
+            self.unmake_move(board, body, tail, checkpoint)
+
+    def search(self, board, body, move, cell, code, depth):
+        """
+        Makes the move on the board and searches further moves up to given depth.
+        Returns the number of moves survived. The board is restored afterwards.
+        """
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # The search state is passed explicitly, so that nothing has to be copied between the levels.
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        if depth == 1:
+            return 1
+        checkpoint = board.checkpoint()
+        tail = self.make_move(board, body, cell, code)
+        try:
+            survived = 1
+            for next_move, next_cell in self.candidate_moves(board, cell, move):
+                survived = max(survived, 1 + self.search(board, body, next_move, next_cell, code, depth - 1))
+                if survived == depth:
+                    # surviving the whole depth is all the deeper levels can tell
+                    break
+            return survived
+        finally:
+            self.unmake_move(board, body, tail, checkpoint)
@@ -0,0 +1,281 @@
+"""Imports"""
+from functools import lru_cache
+from heapq import heappush, heappop
+
+# distance of cells from which none of the targets can be reached
+UNREACHABLE = 1 << 30
+
+
+@lru_cache(maxsize=None)
+def neighbour_table(size):
+    """
+    Returns tuple of neighbouring cell indices for every cell of a square grid.
+    Cells are indexed as y * size + x. Neighbours are in the same order
+    as in Grid.get_walkable_neighbours (up, down, right, left).
+    """
+    table = []
+    for idx in range(size * size):
+        y, x = divmod(idx, size)
+        neighbours = []
+        for nx, ny in ((x, y - 1), (x, y + 1), (x + 1, y), (x - 1, y)):
+            if 0 <= nx < size and 0 <= ny < size:
+                neighbours.append(ny * size + nx)
+        table.append(tuple(neighbours))
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def coordinate_tables(size):
+    """
+    Returns (xs, ys, tie_keys, key_to_idx) of a square grid: coordinates of every cell index,
+    keys breaking ties of the search by (x, y) and cell index of every key.
+    """
+    cells = size * size
+    xs = tuple(idx % size for idx in range(cells))
+    ys = tuple(idx // size for idx in range(cells))
+    tie_keys = tuple(xs[idx] * size + ys[idx] for idx in range(cells))
+    key_to_idx = tuple((key % size) * size + key // size for key in range(cells))
+    return xs, ys, tie_keys, key_to_idx
+
+
+class PathFinder:
+    """
+    A* pathfinding on integer cell indices of a square grid.
+    Scratch arrays are allocated once and reused between searches.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # All the attributes are precomputed tables and scratch arrays used by the search.
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = size * size
+        self.neighbours = neighbour_table(size)
+        # ties in f_cost are broken by (x, y), same as comparing coordinate tuples,
+        # the tables are shared by all pathfinders of the same size
+        self.xs, self.ys, self.tie_keys, self.key_to_idx = coordinate_tables(size)
+
+        self.g_cost = [0] * self.cells
+        self.predecessors = [-1] * self.cells
+        # number of the search in which the cell was discovered / expanded,
+        # so the scratch arrays never have to be cleared
+        self.discovered = [0] * self.cells
+        self.closed = [0] * self.cells
+        self.search_id = 0
+        # number of expanded cells during the last search
+        self.expansions = 0
+
+    def shortest_path(self, walkable, start, end):
+        """
+        Returns list of cell indices representing the shortest path from start to end,
+        or None if the path does not exist.
+        Walkable is a flat sequence of walkable flags indexed by cell index.
+        """
+        # pylint: disable=too-many-locals
+        # Local variables are used on purpose, the loop below is the hot path of the AI.
+        self.search_id += 1
+        search_id = self.search_id
+        cells = self.cells
+        neighbours = self.neighbours
+        xs, ys = self.xs, self.ys
+        tie_keys, key_to_idx = self.tie_keys, self.key_to_idx
+        g_cost = self.g_cost
+        predecessors = self.predecessors
+        discovered = self.discovered
+        closed = self.closed
+        end_x, end_y = xs[end], ys[end]
+
+        g_cost[start] = 0
+        predecessors[start] = -1
+        discovered[start] = search_id
+        # heap entries are single integers: f_cost * cells + tie-break key
+        open_q = [tie_keys[start]]
+        expansions = 0
+
+        while open_q:
+            current = key_to_idx[heappop(open_q) % cells]
+            if closed[current] == search_id:
+                # outdated entry, the cell was already expanded with lower cost
+                continue
+            if current == end:
+                self.expansions = expansions
+                return self.reconstruct_path(end)
+            closed[current] = search_id
+            expansions += 1
+
+            # distance to a neigbour is allways 1
+            new_g_cost = g_cost[current] + 1
+            for n in neighbours[current]:
+                if not walkable[n]:
+                    continue
+                # if neighbour was not yet discovered or if we found a shorter path
+                if discovered[n] != search_id or new_g_cost < g_cost[n]:
+                    discovered[n] = search_id
+                    g_cost[n] = new_g_cost
+                    predecessors[n] = current
+                    f_cost = new_g_cost + abs(xs[n] - end_x) + abs(ys[n] - end_y)
+                    heappush(open_q, f_cost * cells + tie_keys[n])
+
+        # in this case path does not exist
+        self.expansions = expansions
+        return None
+
+    def reconstruct_path(self, end):
+        """Reconstructs path to the end from predecessors of the last search"""
+        path = []
+        current = end
+        while current != -1:
+            path.append(current)
+            current = self.predecessors[current]
+        path.reverse()
+        return path
+
+
+class DistanceField:
+    """
+    Distances from every cell to the nearest target (food), kept up to date between ticks.
+    Changed cells are marked as they change and the field is updated only around them:
+    distances which depended on a blocked cell or removed target are invalidated and recomputed
+    from their valid surroundings, freed cells and new targets only lower the distances around them.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Besides the distances, the field keeps the changes since the last update and the update statistics.
+
+    def __init__(self, size, max_changes=None):
+        self.size = size
+        self.cells = size * size
+        self.neighbours = neighbour_table(size)
+        self.distances = [UNREACHABLE] * self.cells
+        # cells changed since the last update, too many changes are cheaper to handle by full recompute
+        self.changed = []
+        self.max_changes = self.cells // 16 if max_changes is None else max_changes
+        self.full_update = True
+        # number of the update in which the cell was invalidated, so the stamps never have to be cleared
+        self.invalid_stamp = [0] * self.cells
+        self.update_id = 0
+        # number of cells visited during the last update
+        self.expansions = 0
+
+    def mark(self, idx):
+        """Notes that walkability or target flag of the cell changed"""
+        if self.full_update:
+            return
+        self.changed.append(idx)
+        if len(self.changed) > self.max_changes:
+            self.full_update = True
+            self.changed.clear()
+
+    def update(self, walkable, targets):
+        """
+        Brings the field up to date with walkable flags and target cells (set of cell indices).
+        Returns the list of distances (UNREACHABLE for blocked cells and cells without path to a target).
+        """
+        if self.full_update:
+            self.recompute(walkable, targets)
+        elif self.changed:
+            invalid = self.invalidate(walkable, targets)
+            self.repair(walkable, targets, invalid)
+        else:
+            self.expansions = 0
+        self.changed.clear()
+        return self.distances
+
+    def recompute(self, walkable, targets):
+        """Computes the whole field by breadth-first search from all the targets"""
+        distances = [UNREACHABLE] * self.cells
+        neighbours = self.neighbours
+        frontier = []
+        for target in targets:
+            if distances[target]:
+                distances[target] = 0
+                frontier.append(target)
+
+        expansions = 0
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for current in frontier:
+                for n in neighbours[current]:
+                    if walkable[n] and distances[n] == UNREACHABLE:
+                        distances[n] = distance
+                        next_frontier.append(n)
+            expansions += len(frontier)
+            frontier = next_frontier
+        self.distances = distances
+        self.expansions = expansions
+        self.full_update = False
+
+    def invalidate(self, walkable, targets):
+        """
+        Returns list of cells whose distance is no longer supported by any neighbour,
+        because a cell on their way to the target got blocked or the target disappeared.
+        """
+        # pylint: disable=too-many-locals
+        # Local variables are used on purpose, same as in the A* search.
+        distances = self.distances
+        neighbours = self.neighbours
+        self.update_id += 1
+        update_id = self.update_id
+        invalid_stamp = self.invalid_stamp
+        invalid = []
+        # cells are processed level by level in order of their old distance, so that all cells
+        # which lose their support are known before their neighbours are checked
+        levels = {}
+        for idx in self.changed:
+            old = distances[idx]
+            if old != UNREACHABLE and invalid_stamp[idx] != update_id and \
+                    (not walkable[idx] or (old == 0 and idx not in targets)):
+                invalid_stamp[idx] = update_id
+                invalid.append(idx)
+                levels.setdefault(old, []).append(idx)
+
+        while levels:
+            level = min(levels)
+            next_level = level + 1
+            for current in levels.pop(level):
+                for n in neighbours[current]:
+                    if distances[n] != next_level or invalid_stamp[n] == update_id:
+                        continue
+                    # neighbour stays valid if another one of its neighbours is still one step closer
+                    for m in neighbours[n]:
+                        if distances[m] == level and invalid_stamp[m] != update_id:
+                            break
+                    else:
+                        invalid_stamp[n] = update_id
+                        invalid.append(n)
+                        levels.setdefault(next_level, []).append(n)
+        self.expansions = len(invalid)
+        return invalid
+
+    def repair(self, walkable, targets, invalid):
+        """Recomputes distances of the invalid and changed cells and lowers the distances around them"""
+        distances = self.distances
+        neighbours = self.neighbours
+        for idx in invalid:
+            distances[idx] = UNREACHABLE
+
+        levels = {}
+        for idx in invalid + self.changed:
+            if not walkable[idx]:
+                distances[idx] = UNREACHABLE
+                continue
+            distance = 0 if idx in targets else min(distances[n] for n in neighbours[idx]) + 1
+            if distance < distances[idx]:
+                distances[idx] = distance
+                levels.setdefault(distance, []).append(idx)
+
+        expansions = 0
+        while levels:
+            level = min(levels)
+            next_level = level + 1
+            for current in levels.pop(level):
+                if distances[current] != level:
+                    continue
+                expansions += 1
+                for n in neighbours[current]:
+                    if walkable[n] and distances[n] > next_level:
+                        distances[n] = next_level
+                        levels.setdefault(next_level, []).append(n)
+        self.expansions += expansions
@@ -0,0 +1,212 @@
+"""Imports"""
+import csv
+import functools
+import importlib
+import json
+import time
+from collections import deque
+
+# measured methods: name in the results -> (import path of the class, method)
+# classes are imported only when the profiler is installed, so that importing it doesn't load the game (and pygame)
+INSTRUMENTED = {
+    "game_update": ("src.game.Game", "update"),
+    "enemy_move": ("src.game_objects.EnemySnake", "move"),
+    "shortest_path": ("src.grid.Grid", "shortest_path_cells"),
+    "food_field": ("src.grid.Grid", "food_distances"),
+    "food_spawn": ("src.game_objects.Food", "try_to_spawn"),
+    "draw_tile": ("src.grid.TILE", "draw"),
+    "draw_all": ("src.grid.Grid", "draw_all"),
+    "draw_text": ("src.game.Game", "write_text"),
+    "draw_score": ("src.game.Game", "display_score"),
+    "display_update": ("src.game.Game", "update_display"),
+}
+# upper bounds of tick (frame) time histogram buckets in milliseconds (last bucket is everything slower)
+FRAME_BUCKETS = (2, 4, 8, 17, 33, 50, 100)
+# counted cells visited by the searches: A* of the single snakes and updates of the shared food field
+EXPANSION_COUNTERS = ("astar_expansions", "field_expansions")
+
+
+def import_class(path):
+    """Returns class given by its import path (module.Class)"""
+    module, name = path.rsplit(".", 1)
+    return getattr(importlib.import_module(module), name)
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of the game. Measured methods are wrapped only while the profiler is installed,
+    so there is no overhead at all when it's not used.
+    Times are collected per tick (frame of the game or a step of a headless simulation).
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # The profiler keeps running totals of the current tick together with the history and dump settings.
+
+    def __init__(self, dump_path=None, dump_interval=5.0, history=600):
+        # results are dumped periodically to this file, as CSV rows of ticks or JSON summary (by extension)
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.last_dump = time.perf_counter()
+        self.tick_start = time.perf_counter()
+        # seconds spent in each measured method during the current tick
+        self.current = dict.fromkeys(INSTRUMENTED, 0.0)
+        # cells visited during the current tick by each kind of search (EXPANSION_COUNTERS)
+        self.expansions = dict.fromkeys(EXPANSION_COUNTERS, 0)
+        self.tick_count = 0
+        # last ticks, each as dict of milliseconds spent in the measured methods
+        self.history = deque(maxlen=history)
+        self.pending_rows = []
+        self.frame_histogram = [0] * (len(FRAME_BUCKETS) + 1)
+        self.originals = {}
+
+    def install(self):
+        """Wraps all measured methods"""
+        for name, (path, method) in INSTRUMENTED.items():
+            cls = import_class(path)
+            original = cls.__dict__[method]
+            self.originals[name] = original
+            if name == "game_update":
+                setattr(cls, method, self.wrap_frame(original))
+            elif name == "shortest_path":
+                setattr(cls, method, self.wrap_pathfinding(original))
+            elif name == "food_field":
+                setattr(cls, method, self.wrap_food_field(original))
+            else:
+                setattr(cls, method, self.wrap(name, original))
+
+    def uninstall(self):
+        """Restores the original methods and writes the ticks not dumped yet"""
+        for name, original in self.originals.items():
+            path, method = INSTRUMENTED[name]
+            setattr(import_class(path), method, original)
+        self.originals.clear()
+        if self.dump_path is not None:
+            self.dump()
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    def wrap(self, name, func):
+        """Returns the function wrapped, so that its time is added to the current tick"""
+        current = self.current
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current[name] += perf_counter() - start
+        return timed
+
+    def wrap_pathfinding(self, func):
+        """Same as wrap, but also counts cells expanded by A*"""
+        timed = self.wrap("shortest_path", func)
+
+        @functools.wraps(func)
+        def counted(grid, *args, **kwargs):
+            try:
+                return timed(grid, *args, **kwargs)
+            finally:
+                self.expansions["astar_expansions"] += grid.pathfinder.expansions
+        return counted
+
+    def wrap_food_field(self, func):
+        """Same as wrap, but also counts cells visited by updates of the food distance field"""
+        timed = self.wrap("food_field", func)
+
+        @functools.wraps(func)
+        def counted(grid, *args, **kwargs):
+            try:
+                return timed(grid, *args, **kwargs)
+            finally:
+                self.expansions["field_expansions"] += grid.food_field.expansions
+        return counted
+
+    def wrap_frame(self, func):
+        """Wraps a method running the whole frame, the tick ends after it"""
+        timed = self.wrap("game_update", func)
+
+        @functools.wraps(func)
+        def frame(*args, **kwargs):
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                self.end_tick()
+        return frame
+
+    def end_tick(self):
+        """Stores times of the current tick and starts a new one"""
+        self.tick_count += 1
+        now = time.perf_counter()
+        record = {name: seconds * 1000 for name, seconds in self.current.items()}
+        record.update(self.expansions)
+        # whole time of the tick (frame), including everything which isn't measured
+        record["tick_time"] = (now - self.tick_start) * 1000
+        self.tick_start = now
+        self.history.append(record)
+        if self.dump_path is not None:
+            self.pending_rows.append(record)
+
+        bucket = 0
+        while bucket < len(FRAME_BUCKETS) and record["tick_time"] > FRAME_BUCKETS[bucket]:
+            bucket += 1
+        self.frame_histogram[bucket] += 1
+
+        for name in self.current:
+            self.current[name] = 0.0
+        for name in self.expansions:
+            self.expansions[name] = 0
+
+        if self.dump_path is not None and time.perf_counter() - self.last_dump >= self.dump_interval:
+            self.dump()
+
+    def means(self, last=None):
+        """Returns mean times (ms) of the measured methods and search expansions over the last ticks"""
+        records = list(self.history)[-last:] if last else self.history
+        count = max(len(records), 1)
+        means = dict.fromkeys(self.current, 0.0)
+        means.update(dict.fromkeys(EXPANSION_COUNTERS, 0.0))
+        means["tick_time"] = 0.0
+        for record in records:
+            for name, value in record.items():
+                means[name] += value / count
+        return means
+
+    def summary(self):
+        """Returns mean times (ms) of the measured methods over the recent ticks and the frame time histogram"""
+        labels = [f"<={bound}ms" for bound in FRAME_BUCKETS] + [f">{FRAME_BUCKETS[-1]}ms"]
+        return {
+            "ticks": self.tick_count,
+            "mean": self.means(),
+            "frame_histogram": dict(zip(labels, self.frame_histogram)),
+        }
+
+    def dump(self):
+        """Writes collected data to the dump file (CSV rows of ticks since the last dump, or JSON summary)"""
+        self.last_dump = time.perf_counter()
+        if str(self.dump_path).endswith(".csv"):
+            first_tick = self.tick_count - len(self.pending_rows) + 1
+            # the file is started over (with a header) by the first dump
+            with open(self.dump_path, "w" if first_tick == 1 else "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if first_tick == 1:
+                    writer.writerow(["tick", *INSTRUMENTED, *EXPANSION_COUNTERS, "tick_time"])
+                for tick, record in enumerate(self.pending_rows, first_tick):
+                    writer.writerow([tick, *(f"{value:.4f}" for value in record.values())])
+        else:
+            with open(self.dump_path, "w", encoding="utf-8") as f:
+                json.dump(self.summary(), f, indent=2)
+        self.pending_rows.clear()
+
+    def overlay_lines(self, last=60):
+        """Returns short text lines describing the recent ticks, for on-screen overlay"""
+        mean = self.means(last)
+        return [f"tick {mean['tick_time']:.2f} ms"] + \
+            [f"{name} {mean[name]:.2f} ms" for name in INSTRUMENTED] + \
+            [f"A* nodes {mean['astar_expansions']:.0f}", f"field nodes {mean['field_expansions']:.0f}"]
@@ -0,0 +1,108 @@
+"""Imports"""
+import os
+import queue
+import threading
+
+import numpy as np
+
+from src.grid import TILE_COLORS
+
+# RGB color of every tile type code
+PALETTE = np.array(TILE_COLORS, dtype=np.uint8)
+FRAME_FORMATS = ("raw", "ppm")
+# pixels per tile of recorded frames
+DEFAULT_FRAME_SCALE = 8
+# simulation waits for the writing once this many frames are queued
+MAX_QUEUED_FRAMES = 256
+
+
+def render_frame(types, scale=DEFAULT_FRAME_SCALE):
+    """Returns RGB image (height, width, 3) of the board rendered straight from the array of tile type codes"""
+    image = PALETTE[types]
+    return image.repeat(scale, axis=0).repeat(scale, axis=1)
+
+
+class FrameRecorder:
+    """
+    Records boards of a game as frames. The simulation only queues a copy of the tile codes
+    (one byte per tile), rendering and writing happen on a background thread.
+    Frames are written either as one raw RGB24 stream (usable by video encoders as rawvideo)
+    or as a sequence of PPM images in a directory.
+    Error of the writing is raised by the next add or by close.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    # Besides the output settings, the recorder keeps its queue, worker thread and the error of the writing.
+
+    def __init__(self, path, frame_format="raw", scale=DEFAULT_FRAME_SCALE, max_queued=MAX_QUEUED_FRAMES):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # Everything except the path is an optional setting of the output.
+        if frame_format not in FRAME_FORMATS:
+            raise ValueError(f"Unknown frame format {frame_format}")
+        self.path = path
+        self.frame_format = frame_format
+        self.scale = scale
+        self.frames = 0
+        # bounded, so that a slow disk holds the simulation back instead of filling the memory
+        self.queue = queue.Queue(maxsize=max_queued)
+        # exception raised by the worker, None while the writing goes well
+        self.error = None
+        # true once the worker took the end of the frames (None) from the queue
+        self.finished = False
+        self.worker = threading.Thread(target=self.write_frames, daemon=True)
+        self.worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, types):
+        """Queues the board (array of tile type codes) as the next frame, waits only while the queue is full"""
+        if self.error is not None:
+            raise self.error
+        self.queue.put(types.copy())
+        self.frames += 1
+
+    def write_frames(self):
+        """Runs on the worker thread, keeps the error of the writing for the simulation thread"""
+        try:
+            self.write_queued()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # raised again by add or close in the thread of the simulation
+            self.error = error
+            # frames queued after the error are dropped, so that add never waits on a full queue
+            while not self.finished:
+                self.next_board()
+
+    def next_board(self):
+        """Returns the next queued board, waits for it if there is none (None once the recorder is closed)"""
+        types = self.queue.get()
+        if types is None:
+            self.finished = True
+        return types
+
+    def write_queued(self):
+        """Renders and writes queued boards until the recorder is closed"""
+        if self.frame_format == "raw":
+            with open(self.path, "wb") as f:
+                while (types := self.next_board()) is not None:
+                    f.write(render_frame(types, self.scale).tobytes())
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        number = 0
+        while (types := self.next_board()) is not None:
+            image = render_frame(types, self.scale)
+            number += 1
+            with open(os.path.join(self.path, f"frame_{number:06d}.ppm"), "wb") as f:
+                f.write(f"P6 {image.shape[1]} {image.shape[0]} 255\n".encode("ascii"))
+                f.write(image.tobytes())
+
+    def close(self):
+        """Waits until all queued frames are written, raises the error of the writing if there was one"""
+        self.queue.put(None)
+        self.worker.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,107 @@
+"""Imports"""
+import os
+import struct
+
+import numpy as np
+
+from src.config import GRID_SIZE, board_config
+from src.vector import Vector2
+
+# Replay file layout (little endian):
+#   header: magic, format version, grid size, seed
+#   events: tick, event kind, two unsigned 16 bit values
+# Directions are stored shifted by one, so that they fit into unsigned values.
+MAGIC = b"SNKR"
+VERSION = 1
+HEADER = struct.Struct("<4sBHQ")
+EVENT = struct.Struct("<IBHH")
+
+DIRECTION_EVENT = 0
+FOOD_EVENT = 1
+END_EVENT = 2
+WINNERS = (None, "player", "enemy")
+
+
+def numbered_path(path, number):
+    """Returns path with the number of the match before its extension (game.replay -> game_3.replay)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}_{number}{ext}"
+
+
+def new_seed():
+    """Returns random seed for a new game"""
+    return int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0])
+
+
+class ReplayRecorder:
+    """Records everything needed to replay a game into a compact binary log"""
+
+    def __init__(self, seed, grid_size=GRID_SIZE):
+        self.data = bytearray(HEADER.pack(MAGIC, VERSION, grid_size, seed))
+
+    def direction(self, tick, direction):
+        """Records direction of the player for moves from given tick on"""
+        self.data += EVENT.pack(tick, DIRECTION_EVENT, int(direction.x) + 1, int(direction.y) + 1)
+
+    def food(self, tick, pos):
+        """Records food spawned at given position"""
+        self.data += EVENT.pack(tick, FOOD_EVENT, int(pos.x), int(pos.y))
+
+    def end(self, tick, winner):
+        """Records the end of the game"""
+        self.data += EVENT.pack(tick, END_EVENT, WINNERS.index(winner), 0)
+
+    def save(self, path):
+        """Writes the replay to a file"""
+        with open(path, "wb") as f:
+            f.write(self.data)
+
+
+class Replay:
+    """Game loaded from the replay log"""
+
+    def __init__(self, data):
+        magic, version, self.grid_size, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a supported replay file")
+        self.directions = {}
+        self.food = []
+        self.ticks = None
+        self.winner = None
+        for tick, kind, a, b in EVENT.iter_unpack(memoryview(data)[HEADER.size:]):
+            if kind == DIRECTION_EVENT:
+                self.directions[tick] = Vector2(a - 1, b - 1)
+            elif kind == FOOD_EVENT:
+                self.food.append((tick, Vector2(a, b)))
+            elif kind == END_EVENT:
+                self.ticks = tick
+                self.winner = WINNERS[a]
+
+    @classmethod
+    def load(cls, path):
+        """Loads replay from a file"""
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def run(self):
+        """
+        Re-runs the game headlessly as fast as possible.
+        Returns the finished engine, raises ValueError if the game diverged from the log.
+        """
+        # imported here, engine itself uses the recorder from this module
+        from src.engine import Engine  # pylint: disable=import-outside-toplevel
+
+        engine = Engine(seed=self.seed, record=True, config=board_config(self.grid_size))
+        while not engine.is_over:
+            if self.ticks is not None and engine.ticks > self.ticks:
+                break
+            direction = self.directions.get(engine.ticks)
+            if direction is not None:
+                engine.player.direction = direction
+            engine.step()
+
+        # both runs have to spawn the same food at the same time and end the same way
+        replayed = Replay(engine.recorder.data)
+        if replayed.food != self.food or (replayed.ticks, replayed.winner) != (self.ticks, self.winner):
+            raise ValueError("Replayed game diverged from the recorded one")
+        return engine
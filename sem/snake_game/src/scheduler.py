@@ -0,0 +1,36 @@
+"""Imports"""
+
+
+class TickScheduler:
+    """
+    Fixed timestep scheduler. Time of rendered frames is accumulated
+    and turned into a number of simulation ticks of fixed length,
+    so the simulation rate doesn't depend on the frame rate.
+    """
+
+    def __init__(self, tick_interval, max_ticks_per_frame, speed=1.0):
+        # length of one tick in milliseconds (of game time)
+        self.tick_interval = tick_interval
+        # cap of ticks simulated in one frame, so that slow frames can't pile up more and more work
+        self.max_ticks_per_frame = max_ticks_per_frame
+        # speed multiplier of the game time, None means as fast as possible
+        self.speed = speed
+        self.accumulator = 0.0
+
+    def reset(self):
+        """Forgets all accumulated time"""
+        self.accumulator = 0.0
+
+    def advance(self, frame_time):
+        """Adds time of the last frame (in milliseconds) and returns number of ticks to simulate now"""
+        if self.speed is None:
+            return self.max_ticks_per_frame
+
+        self.accumulator += frame_time * self.speed
+        ticks = int(self.accumulator // self.tick_interval)
+        if ticks > self.max_ticks_per_frame:
+            # catch up only partially, the rest of the time is dropped
+            self.accumulator = 0.0
+            return self.max_ticks_per_frame
+        self.accumulator -= ticks * self.tick_interval
+        return ticks
@@ -0,0 +1,181 @@
+"""Imports"""
+import asyncio
+import struct
+
+import numpy as np
+
+from src.config import DEFAULT_CONFIG, MOVE_INTERVAL
+from src.engine import Engine
+from src.game_objects import DIRECTIONS
+from src.replay import WINNERS
+
+# Protocol (little endian), plain TCP:
+#   client -> server: one byte per input, index of the direction in game_objects.DIRECTIONS
+#   server -> client: messages of a header (kind, tick, count) followed by count cells (cell index, tile code)
+# HELLO carries the grid size in count, END carries index of the winner in replay.WINNERS.
+# Counts and cell indices are 32 bit, so that boards of any size fit.
+MESSAGE = struct.Struct("<BII")
+CELL = struct.Struct("<IB")
+HELLO, FULL, DELTA, END = range(4)
+# clients which don't read their messages are disconnected once this many bytes wait for them
+MAX_PENDING_BYTES = 1 << 16
+
+
+def encode_cells(kind, tick, cells, types):
+    """Returns message with given cells and their tile codes"""
+    message = bytearray(MESSAGE.pack(kind, tick, len(cells)))
+    for idx in cells:
+        message += CELL.pack(idx, types[idx])
+    return message
+
+
+class Match:
+    """One game on the server played by a remote client against the AI"""
+
+    def __init__(self, engine, writer):
+        self.engine = engine
+        # tiles changed during a tick are sent to the client, the log doesn't touch the undo journal of the grid
+        engine.grid.log_changes()
+        self.writer = writer
+        # last direction received from the client, applied in the next tick
+        self.direction = None
+        self.closed = False
+
+    def send(self, message):
+        """Queues message for the client, disconnects clients which stopped reading"""
+        if self.closed:
+            return
+        transport = self.writer.transport
+        if transport.is_closing() or transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            self.close()
+            return
+        self.writer.write(message)
+
+    def start(self):
+        """Sends the grid size and the whole board"""
+        types = self.engine.grid.types.ravel()
+        # the whole board is sent, changes so far are included
+        self.engine.grid.drain_changes()
+        self.send(MESSAGE.pack(HELLO, 0, self.engine.grid.config.grid_size))
+        self.send(encode_cells(FULL, 0, np.flatnonzero(types).tolist(), types))
+
+    def tick(self):
+        """Advances the game by one tick and sends the tiles which changed"""
+        grid = self.engine.grid
+        self.engine.step(self.direction)
+        self.send(encode_cells(DELTA, self.engine.ticks, grid.drain_changes(), grid.types.ravel()))
+        if self.engine.is_over:
+            self.send(MESSAGE.pack(END, self.engine.ticks, WINNERS.index(self.engine.winner)))
+            self.close()
+
+    def close(self):
+        """Ends the match and closes the connection"""
+        self.closed = True
+        self.writer.close()
+
+
+class GameServer:
+    """
+    Hosts many matches on one asyncio event loop. All matches are advanced together
+    in fixed ticks and every client gets only the tiles changed during the tick.
+    """
+
+    def __init__(self, tick_interval=MOVE_INTERVAL / 1000, seed=None, config=DEFAULT_CONFIG):
+        self.tick_interval = tick_interval
+        # board of every match (config.BoardConfig)
+        self.config = config
+        self.seeds = np.random.SeedSequence(seed)
+        self.matches = []
+        self.server = None
+        self.ticks = 0
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Starts listening, returns the port (a free one is picked for port 0)"""
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle_client(self, reader, writer):
+        """Starts new match for the connected client and reads its inputs"""
+        seed = int(self.seeds.spawn(1)[0].generate_state(1, dtype=np.uint64)[0])
+        match = Match(Engine(seed=seed, config=self.config), writer)
+        match.start()
+        self.matches.append(match)
+        while not match.closed:
+            data = await reader.read(64)
+            if not data:
+                break
+            # only the latest input matters for the next tick
+            if data[-1] < len(DIRECTIONS):
+                match.direction = DIRECTIONS[data[-1]]
+        if not match.closed:
+            match.close()
+
+    def tick(self):
+        """Advances all running matches by one tick"""
+        self.ticks += 1
+        for match in self.matches:
+            if not match.closed:
+                match.tick()
+        self.matches = [match for match in self.matches if not match.closed]
+
+    async def run(self, ticks=None):
+        """Runs the fixed tick loop (forever by default), late ticks are caught up without drifting"""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        start = self.ticks
+        while ticks is None or self.ticks - start < ticks:
+            next_tick += self.tick_interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.tick()
+
+    async def close(self):
+        """Closes all matches and stops listening"""
+        for match in self.matches:
+            match.close()
+        self.matches.clear()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class LoopbackClient:
+    """Simple client which keeps its own copy of the board from the received messages"""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.board = None
+        self.tick = 0
+        self.winner = None
+        self.received_bytes = 0
+
+    async def connect(self, host, port):
+        """Connects to the server and waits for the whole board"""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        await self.receive()
+        await self.receive()
+
+    def send_direction(self, direction):
+        """Sends direction (Vector2) of the player"""
+        self.writer.write(bytes([DIRECTIONS.index(direction)]))
+
+    async def receive(self):
+        """Reads one message and applies it to the board. Returns kind of the message."""
+        header = await self.reader.readexactly(MESSAGE.size)
+        kind, self.tick, count = MESSAGE.unpack(header)
+        self.received_bytes += len(header)
+        if kind == HELLO:
+            self.board = np.zeros(count * count, dtype=np.uint8)
+        elif kind == END:
+            self.winner = WINNERS[count]
+        else:
+            payload = await self.reader.readexactly(count * CELL.size)
+            self.received_bytes += len(payload)
+            for idx, code in CELL.iter_unpack(payload):
+                self.board[idx] = code
+        return kind
+
+    async def close(self):
+        """Closes the connection"""
+        self.writer.close()
+        await self.writer.wait_closed()
@@ -0,0 +1,18 @@
+"""Imports"""
+from functools import lru_cache
+
+import pygame
+
+
+@lru_cache(maxsize=None)
+def get_font(font, font_size):
+    """Returns system font of given size. Each font is looked up and loaded only once, the first one initializes fonts."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.SysFont(font, font_size)
+
+
+@lru_cache(maxsize=256)
+def render_text(text, font, font_size, color):
+    """Returns surface with rendered text. Recently rendered texts are cached."""
+    return get_font(font, font_size).render(text, True, color)
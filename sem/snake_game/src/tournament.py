@@ -0,0 +1,130 @@
+"""Imports"""
+import json
+import os
+import time
+from functools import partial
+from itertools import product
+from multiprocessing import Pool
+
+import numpy as np
+
+import src.config as conf
+from src.engine import Engine
+from src.lookahead import LookaheadAI
+from src.recording import FrameRecorder
+
+# AI variants of the enemy snake: name -> factory of the AI (None is the greedy enemy following the shortest path)
+ENEMY_AIS = {
+    "greedy": lambda: None,
+    "lookahead": LookaheadAI,
+}
+
+
+def play_match(match, max_ticks, frames=None):
+    """
+    Plays one AI vs AI match given as (seed, grid size, name of the enemy AI) and returns its results.
+    Frames is optional (directory, format, scale), every tick of the match is then recorded there.
+    If writing of the frames fails, the match stops and its error is in the results.
+    """
+    seed, grid_size, ai = match
+    # tables of the board are computed once per size in every worker
+    engine = Engine(seed=seed, enemy_ai=ENEMY_AIS[ai](), config=conf.board_config(grid_size))
+    recorder = None
+    error = None
+    start = time.perf_counter()
+    try:
+        if frames is not None:
+            recorder = open_recorder(frames, seed)
+            recorder.add(engine.grid.types)
+        while not engine.is_over and engine.ticks < max_ticks:
+            # the player snake follows the shortest path to the food, same as the greedy enemy
+            engine.player.steer_to_food()
+            engine.step()
+            if recorder is not None:
+                recorder.add(engine.grid.types)
+    except OSError as exc:
+        # only this match fails, the rest of the tournament goes on
+        error = str(exc)
+    finally:
+        if recorder is not None:
+            error = close_recorder(recorder) or error
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seed": seed,
+        "grid_size": grid_size,
+        "ai": ai,
+        "winner": engine.winner,
+        "player_len": engine.player.get_snake_len(),
+        "enemy_len": engine.enemy.get_snake_len(),
+        "ticks": engine.ticks,
+        "seconds": elapsed,
+        "ms_per_tick": elapsed * 1000 / max(engine.ticks, 1),
+        "error": error,
+    }
+
+
+def open_recorder(frames, seed):
+    """Returns recorder of the frames (directory, format, scale) of the match with given seed"""
+    directory, frame_format, scale = frames
+    name = f"{seed}.rgb" if frame_format == "raw" else str(seed)
+    return FrameRecorder(os.path.join(directory, name), frame_format, scale)
+
+
+def close_recorder(recorder):
+    """Closes the frame recorder, returns the error of the writing as text (None if all frames were written)"""
+    try:
+        recorder.close()
+    except OSError as error:
+        return str(error)
+    return None
+
+
+def schedule_matches(games, seed, grid_size, ai="greedy"):
+    """
+    Returns (seed, grid size, enemy AI) of every match. If there are more sizes or AIs,
+    the matches take turns in using every combination of them.
+    """
+    seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(games, dtype=np.uint64)]
+    sizes = [grid_size] if isinstance(grid_size, int) else list(grid_size)
+    ais = [ai] if isinstance(ai, str) else list(ai)
+    variants = list(product(sizes, ais))
+    return [(match_seed, *variants[i % len(variants)]) for i, match_seed in enumerate(seeds)]
+
+
+def run_tournament(games, out_path, *, workers=None, seed=0, grid_size=conf.GRID_SIZE, ai="greedy",
+                   max_ticks=100000, frames=None):
+    """
+    Plays given number of matches in a pool of worker processes (one per core by default).
+    Grid size can be also a sequence of sizes and AI of the enemy (name in ENEMY_AIS) a sequence of AIs,
+    the matches then take turns in using them, so that the AI variants can be compared.
+    Results are written to out_path as JSON lines as soon as each match finishes.
+    With frames (directory, format, scale) every match is recorded, see play_match.
+    Returns summary of the whole tournament.
+    """
+    # pylint: disable=too-many-arguments
+    # All the arguments are independent settings of the tournament.
+    matches = schedule_matches(games, seed, grid_size, ai)
+    summary = {"games": 0, "player": 0, "enemy": 0, "draw": 0, "failed": 0, "ticks": 0,
+               # matches played and won by each AI of the enemy
+               "ai": {name: {"games": 0, "enemy": 0} for name in sorted({match[2] for match in matches})}}
+    start = time.perf_counter()
+    if frames is not None:
+        os.makedirs(frames[0], exist_ok=True)
+
+    # every match gets its board size as a parameter, so workers of one pool can play boards of any size
+    with Pool(workers) as pool, open(out_path, "w", encoding="utf-8") as out:
+        chunksize = max(1, games // ((workers or os.cpu_count()) * 16))
+        for result in pool.imap_unordered(partial(play_match, max_ticks=max_ticks, frames=frames), matches, chunksize):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            summary["games"] += 1
+            # failed matches didn't finish, they count neither as won nor as a draw
+            summary["failed" if result["error"] else result["winner"] or "draw"] += 1
+            summary["ticks"] += result["ticks"]
+            summary["ai"][result["ai"]]["games"] += 1
+            summary["ai"][result["ai"]]["enemy"] += result["winner"] == "enemy" and not result["error"]
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["games_per_second"] = summary["games"] / summary["seconds"]
+    return summary
@@ -0,0 +1,68 @@
+"""Imports"""
+
+
+class Vector2:
+    """
+    2D vector of positions and directions on the board, a small pure Python part of pygame.math.Vector2.
+    Importing pygame.math initializes the whole pygame package (with a banner and ~0.3 s of imports), so the simulation
+    uses this one and only the window imports pygame. It is created and compared the same way as the pygame vector
+    (from two numbers or from another vector / sequence, components are floats), the two can be mixed.
+    """
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x=0.0, y=None):
+        if y is None:
+            if isinstance(x, (int, float)):
+                self.x = self.y = float(x)
+            else:
+                self.x, self.y = float(x[0]), float(x[1])
+        else:
+            self.x = float(x)
+            self.y = float(y)
+
+    def __repr__(self):
+        return f"Vector2({self.x}, {self.y})"
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __eq__(self, other):
+        try:
+            return len(other) == 2 and self.x == other[0] and self.y == other[1]
+        except TypeError:
+            return NotImplemented
+
+    # mutable, so not hashable, same as the pygame vector
+    __hash__ = None
+
+    def __bool__(self):
+        return self.x != 0 or self.y != 0
+
+    def __neg__(self):
+        return Vector2(-self.x, -self.y)
+
+    def __add__(self, other):
+        return Vector2(self.x + other[0], self.y + other[1])
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Vector2(self.x - other[0], self.y - other[1])
+
+    def __rsub__(self, other):
+        return Vector2(other[0] - self.x, other[1] - self.y)
+
+    def __mul__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    __rmul__ = __mul__
@@ -0,0 +1,64 @@
+"""imports"""
+from pygame.math import Vector2
+
+from src.arena import Arena
+from src.pathfinding import DistanceField, UNREACHABLE
+
+
+def test_distance_field():
+    """Distance field holds distance to the nearest target, blocked cells are unreachable"""
+    walkable = bytearray(b"\x01" * 9)
+    walkable[4] = 0
+    field = DistanceField(3).update(walkable, {0, 8})
+    assert field[0] == 0 and field[8] == 0
+    assert field[1] == 1 and field[2] == 2 and field[6] == 2
+    assert field[4] == UNREACHABLE
+
+
+def test_distance_field_incremental():
+    """Field updated only around the changed tiles is the same as the field computed from scratch"""
+    arena = Arena(8, seed=1, n_food=3)
+    for _ in range(200):
+        arena.step()
+        field = arena.grid.food_distances()
+        full = DistanceField(arena.grid.pathfinder.size)
+        assert field == full.update(arena.grid.walkable_cells, arena.grid.food_cells)
+        if arena.is_over:
+            break
+
+
+def test_arena_owners():
+    """Every snake tile is owned by its snake"""
+    arena = Arena(5, seed=0)
+    for _ in range(20):
+        arena.step()
+    for snake in arena.snakes:
+        for pos in snake.body:
+            assert arena.grid.get_owner(pos) == snake.snake_id
+
+
+def test_arena_dead_snake_is_removed():
+    """Dead snake gets removed from the board and doesn't move anymore"""
+    arena = Arena(3, seed=0)
+    snake = arena.snakes[0]
+    arena.grid.change_cell("nothing", snake.body.pop(), None)
+    snake.body.append(3)
+    arena.grid.change_cell("enemy", 3, None, owner=0)
+    # the snake keeps moving up, out of the board
+    snake.direction = snake.last_direction = Vector2(0, -1)
+    snake.steer_by_field = lambda field: None
+    arena.step()
+    assert not arena.alive[0]
+    assert arena.death_ticks[0] == 1
+    assert not snake.body
+
+
+def test_arena_seeded():
+    """Arena with the same seed plays out the same, with per-snake results"""
+    results = []
+    for _ in range(2):
+        arena = Arena(6, seed=3, n_food=2)
+        arena.run(max_ticks=3000)
+        results.append((arena.ticks, arena.winner, arena.results()))
+    assert results[0] == results[1]
+    assert sum(result["score"] for result in results[0][2]) > 0
@@ -0,0 +1,65 @@
+"""imports"""
+import numpy as np
+from pygame.math import Vector2
+
+from src.batch import BatchEnv, UP, DOWN, RIGHT, NO_WINNER, ENEMY_WON, PLAYER_WON, DRAW, PLAYER, ENEMY
+from src.engine import Engine
+from src.env import ActionController
+from src.config import board_config
+from src.grid import TILE_CODES, NOTHING
+
+
+def test_reset():
+    """Every new game has both snakes and one food"""
+    env = BatchEnv(8, seed=0)
+    for code in ("player", "enemy", "food"):
+        assert ((env.flat_board == TILE_CODES[code]).sum(axis=1) == 1).all()
+    assert (env.winner == NO_WINNER).all()
+
+
+def test_player_out_of_bounds():
+    """Player starting in the corner loses after moving up"""
+    env = BatchEnv(4, seed=0)
+    winner = env.step(np.full(4, UP), np.full(4, RIGHT))
+    assert (winner == ENEMY_WON).all()
+    # same as in the Engine, the tick doesn't count when the player dies on its move
+    engine = Engine()
+    engine.step(Vector2(0, -1))
+    assert (env.ticks == engine.ticks).all()
+
+
+def test_enemy_out_of_bounds():
+    """Enemy starting in the corner loses after moving down, in the first tick same as in the Engine"""
+    env = BatchEnv(4, seed=0)
+    winner = env.step(np.full(4, RIGHT), np.full(4, DOWN))
+    assert (winner == PLAYER_WON).all()
+    controller = ActionController()
+    controller.action = DOWN
+    engine = Engine(enemy_ai=controller)
+    engine.step(Vector2(1, 0))
+    assert engine.winner == "player"
+    assert (env.ticks == engine.ticks).all()
+
+
+def test_greedy_games():
+    """Board stays consistent with the snake bodies while the games run"""
+    env = BatchEnv(32, seed=1)
+    for _ in range(300):
+        env.step(env.greedy_actions(PLAYER), env.greedy_actions(ENEMY))
+        running = ~env.done
+        for snake, code in ((PLAYER, "player"), (ENEMY, "enemy")):
+            on_board = (env.flat_board[running] == TILE_CODES[code]).sum(axis=1)
+            assert (on_board == env.lengths[running, snake]).all()
+        env.reset(env.done)
+    assert env.lengths.max() > 1
+
+
+def test_full_board():
+    """Same as in the Engine, games without an empty tile for the food end: longer snake wins, equal snakes draw"""
+    env = BatchEnv(2, seed=0, config=board_config(4))
+    env.flat_board[env.flat_board == NOTHING] = TILE_CODES["enemy"]
+    env.lengths[1, ENEMY] = 3
+    env.spawn_food(np.arange(2))
+    assert (env.food == -1).all()
+    assert list(env.winner) == [DRAW, ENEMY_WON]
+    assert env.done.all()
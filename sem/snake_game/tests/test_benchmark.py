@@ -0,0 +1,42 @@
+"""imports"""
+import subprocess
+import sys
+
+from src import benchmark
+
+
+def test_compare():
+    """Only benchmarks slower than the tolerance are reported"""
+    baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+    results = {"a": 1.2, "b": 2.0, "c": 0.5, "d": 9.0}
+    assert benchmark.compare(results, baseline, tolerance=0.5) == {"b": 2.0}
+
+
+def test_run_benchmarks():
+    """Benchmarks run and report time of one operation"""
+    results = benchmark.run_benchmarks(["shortest_path_test_board", "food_spawn_full_board"], repeat=1)
+    assert set(results) == {"shortest_path_test_board", "food_spawn_full_board"}
+    assert all(seconds > 0 for seconds in results.values())
+
+
+def test_long_snake_board():
+    """Path on the long snake board goes through the whole board"""
+    size = 10
+    finder = benchmark.PathFinder(size)
+    path = finder.shortest_path(benchmark.long_snake_board(size), 0, size * size - 1)
+    assert len(path) == (size // 2) * size + size // 2
+
+
+def test_cli_startup_imports():
+    """Command line is parsed without importing pygame or NumPy"""
+    imports = subprocess.run([sys.executable, "-X", "importtime", "__main__.py", "--help"], cwd=benchmark.PACKAGE_DIR,
+                             check=True, capture_output=True, text=True).stderr
+    assert "argparse" in imports
+    assert "pygame" not in imports and "numpy" not in imports
+
+
+def test_simulation_startup_imports():
+    """Simulation without a screen doesn't import pygame"""
+    imports = subprocess.run([sys.executable, "-X", "importtime", *benchmark.STARTUP_COMMANDS["startup_simulation"]],
+                             cwd=benchmark.PACKAGE_DIR, check=True, capture_output=True, text=True).stderr
+    assert "src.engine" in imports and "pygame" not in imports
@@ -4,10 +4,10 @@ import pytest
 from pylint.lint import Run
 from pylint.reporters import CollectingReporter
 
-from src import game, config, game_objects, grid, helpers
+from src import game, config, game_objects, grid, helpers, engine, pathfinding, text, replay, tournament, batch, scheduler, benchmark, profiling, arena, lookahead, body, server, recording, env, vector
 
 
-@pytest.mark.parametrize("file_name", [game, config, game_objects, grid, helpers])
+@pytest.mark.parametrize("file_name", [game, config, game_objects, grid, helpers, engine, pathfinding, text, replay, tournament, batch, scheduler, benchmark, profiling, arena, lookahead, body, server, recording, env, vector])
 def test_codestyle(file_name):
     """ Evaluate codestyle """
     src_file = inspect.getfile(file_name)
@@ -0,0 +1,141 @@
+"""imports"""
+import pygame
+from pygame.math import Vector2
+
+from src.engine import Engine
+from src.replay import Replay, numbered_path
+from src.config import PLAYER_START_POS, GRID_SIZE, board_config
+
+
+def test_engine_is_headless():
+    """Engine runs whole game without initializing the display"""
+    engine = Engine()
+    winner = engine.run(max_ticks=10000)
+    assert winner in ("player", "enemy")
+    assert engine.ticks > 0
+    assert not pygame.display.get_init()
+
+
+def test_engine_step():
+    """Player moves by one tile each tick"""
+    engine = Engine()
+    engine.step(Vector2(0, 1))
+    assert engine.player.body[-1] == PLAYER_START_POS + Vector2(0, 1)
+    assert engine.ticks == 1
+
+
+def test_engine_player_collision():
+    """Player loses after moving out of the board"""
+    engine = Engine()
+    assert engine.step(Vector2(0, -1)) == "enemy"
+    assert engine.is_over
+
+
+def test_enemy_replans_blocked_path():
+    """Enemy snake keeps its path between moves and replans once it gets blocked"""
+    engine = Engine()
+    engine.grid.change_tile("nothing", engine.food.pos, None)
+    engine.food.pos = Vector2(GRID_SIZE - 6, GRID_SIZE - 1)
+    engine.grid.change_tile("food", engine.food.pos, None)
+
+    assert engine.enemy.move()
+    cached = list(engine.enemy.path)
+    assert len(cached) == 4
+    assert engine.enemy.move()
+    assert engine.enemy.path == cached[:-1]
+
+    # block the rest of the path, enemy has to go around
+    engine.grid.change_tile("player", Vector2(GRID_SIZE - 4, GRID_SIZE - 1), None)
+    assert engine.enemy.move()
+    assert engine.enemy.body[-1] == Vector2(GRID_SIZE - 3, GRID_SIZE - 2)
+
+
+def test_seeded_engine():
+    """Games with the same seed spawn food at the same places"""
+    assert Engine(seed=42).food.pos == Engine(seed=42).food.pos
+
+
+def test_replay(tmp_path):
+    """Recorded game plays out the same when replayed"""
+    engine = Engine(seed=7, record=True)
+    directions = [Vector2(0, 1), Vector2(1, 0), Vector2(0, 1), Vector2(1, 0)]
+    while not engine.is_over:
+        engine.step(directions[(engine.ticks // 3) % len(directions)])
+    engine.recorder.save(tmp_path / "game.replay")
+
+    loaded = Replay.load(tmp_path / "game.replay")
+    assert loaded.seed == 7
+    assert loaded.winner == engine.winner
+    replayed = loaded.run()
+    assert replayed.winner == engine.winner
+    assert replayed.ticks == engine.ticks
+    assert (replayed.grid.types == engine.grid.types).all()
+
+
+def test_numbered_replay_path():
+    """Replays of consecutive matches get their own files, numbered before the extension"""
+    assert numbered_path("game.replay", 1) == "game_1.replay"
+    assert numbered_path("replays/game", 12) == "replays/game_12"
+
+
+def test_mixed_board_sizes(tmp_path):
+    """Games on boards of different sizes run side by side in one process, replays remember the size"""
+    small, large = Engine(seed=3, record=True, config=board_config(8)), Engine(seed=3, config=board_config(60))
+    assert small.grid.types.shape == (8, 8) and large.grid.types.shape == (60, 60)
+    assert small.enemy.body[-1] == Vector2(7, 7) and large.enemy.body[-1] == Vector2(59, 59)
+    while not (small.is_over and large.is_over):
+        small.player.steer_to_food()
+        large.player.steer_to_food()
+        small.step()
+        large.step()
+
+    small.recorder.save(tmp_path / "small.replay")
+    replayed = Replay.load(tmp_path / "small.replay").run()
+    assert replayed.grid.config.grid_size == 8
+    assert (replayed.grid.types == small.grid.types).all()
+
+
+def test_full_board():
+    """Game ends once the food has no empty tile left, the longer snake wins and equal snakes draw"""
+    for grow_enemy, winner in ((False, None), (True, "enemy")):
+        engine = Engine(seed=1, record=True, config=board_config(4))
+        grid = engine.grid
+        if grow_enemy:
+            engine.enemy.body.appendleft(grid.config.cell_index(Vector2(3, 2)))
+        # the rest of the board is blocked and a snake covers the food
+        for idx in list(grid.free_cells):
+            grid.change_cell("enemy", idx, None)
+        grid.change_tile("player", engine.food.pos, None)
+
+        engine.update_after_snake_move()
+        assert engine.board_full and engine.is_over
+        assert engine.winner == winner
+        assert engine.step() == winner
+        assert engine.ticks == 0
+        assert Replay(engine.recorder.data).ticks == 0
+
+
+def test_snapshot_restore():
+    """Restored game is the same as when the snapshot was taken and plays out the same again"""
+    engine = Engine(seed=11, record=True)
+    for _ in range(5):
+        engine.step()
+    snapshot = engine.snapshot()
+    state = (engine.grid.types.copy(), list(engine.player.body), list(engine.enemy.body),
+             engine.food.pos, engine.ticks, bytes(engine.recorder.data))
+
+    def play():
+        for tick in range(60):
+            engine.step(Vector2(0, 1) if tick % 8 < 4 else Vector2(1, 0))
+        return engine.grid.types.copy(), list(engine.enemy.body), engine.winner, engine.ticks
+
+    first = play()
+    engine.restore(snapshot)
+    assert (engine.grid.types == state[0]).all()
+    assert (list(engine.player.body), list(engine.enemy.body), engine.food.pos, engine.ticks,
+            bytes(engine.recorder.data)) == state[1:]
+
+    second = play()
+    assert (first[0] == second[0]).all() and first[1:] == second[1:]
+    engine.end_snapshots()
+    assert engine.grid.journal is None
@@ -0,0 +1,74 @@
+"""imports"""
+import numpy as np
+
+from src.config import GRID_SIZE
+from src.env import SnakeEnv, VectorEnv, LOSS_REWARD
+from src.grid import TILE_CODES
+
+UP, DOWN, RIGHT, LEFT = range(4)
+
+
+def test_observation_is_view():
+    """Observation without frame stacking is a view of the board of the game, it's never copied"""
+    env = SnakeEnv(seed=0)
+    observation, info = env.reset()
+    assert observation.shape == (1, GRID_SIZE, GRID_SIZE)
+    assert np.shares_memory(observation, env.engine.grid.types)
+    assert info["ticks"] == 0 and info["length"] == 1
+    observation, _, _, _, _ = env.step(UP)
+    assert np.shares_memory(observation, env.engine.grid.types)
+    assert observation[0, GRID_SIZE - 2, GRID_SIZE - 1] == TILE_CODES["enemy"]
+
+
+def test_frame_stack():
+    """Stacked frames are the last boards, oldest first, viewed from the preallocated ring"""
+    env = SnakeEnv(seed=1, frame_stack=3)
+    observation, _ = env.reset()
+    boards = [env.engine.grid.types.copy()] * 3
+    for action in (UP, UP, LEFT, LEFT, DOWN):
+        observation, _, terminated, _, _ = env.step(action)
+        assert not terminated
+        boards.append(env.engine.grid.types.copy())
+        assert np.shares_memory(observation, env.frames)
+        assert (observation == np.stack(boards[-3:])).all()
+
+
+def test_episode_end():
+    """Agent running into the wall (it starts in the bottom right corner) loses the episode"""
+    env = SnakeEnv(seed=2)
+    env.reset()
+    terminated, reward, ticks = False, 0, 0
+    while not terminated:
+        _, reward, terminated, truncated, info = env.step(DOWN)
+        assert not truncated
+        ticks += 1
+    assert ticks == 1 and info["winner"] == "player" and reward == LOSS_REWARD
+
+
+def test_vector_env():
+    """Environments in the workers play the same as when they are run in one process, with the same seeds"""
+    actions = np.random.default_rng(0).integers(4, size=(30, 5))
+    with VectorEnv(5, workers=2, seed=3, frame_stack=2) as envs, VectorEnv(5, workers=1, seed=3, frame_stack=2) as same:
+        observations = envs.reset()
+        assert observations.shape == (5, 2, GRID_SIZE, GRID_SIZE)
+        assert (observations == same.reset()).all()
+        for tick_actions in actions:
+            observations, rewards, terminated, truncated = envs.step(tick_actions)
+            expected = same.step(tick_actions)
+            assert (observations == expected[0]).all()
+            assert (rewards == expected[1]).all() and (terminated == expected[2]).all()
+            assert not truncated.any()
+            # every board has the agent on it, finished episodes were already restarted
+            assert ((observations[:, -1] == TILE_CODES["enemy"]).sum(axis=(1, 2)) > 0).all()
+
+
+def test_vector_env_final_observation():
+    """Last observation of a truncated episode is kept aside when the environment starts again"""
+    with VectorEnv(1, workers=1, seed=4, max_ticks=3) as envs:
+        envs.reset()
+        for _ in range(3):
+            observations, _, terminated, truncated = envs.step([LEFT])
+        assert truncated[0] and not terminated[0]
+        # the agent moved three tiles left from the bottom right corner, the new episode starts in the corner
+        assert envs.final_observations[0, -1, GRID_SIZE - 1, GRID_SIZE - 4] == TILE_CODES["enemy"]
+        assert observations[0, -1, GRID_SIZE - 1, GRID_SIZE - 4] != TILE_CODES["enemy"]
@@ -1,10 +1,12 @@
 """imports"""
 import pytest
+import pygame
+import numpy as np
 from pygame.math import Vector2
 import warnings
 
-from src import grid, helpers
-from src.config import GRID_SIZE
+from src import grid, helpers, text, scheduler, body
+from src.config import GRID_SIZE, DEFAULT_CONFIG, BoardConfig
 
 
 @pytest.mark.parametrize(
@@ -152,4 +154,126 @@ def test_get_walkable_neigbhours(obstacle_grid, pos, neighbours):
     res = obstacle_grid.get_walkable_neighbours(pos)
     assert len(res) == len(neighbours)
     for n in res:
-        assert n in neighbours
\ No newline at end of file
+        assert n in neighbours
+
+
+def test_change_tile():
+    """Test that tile changes are stored in grid arrays"""
+    g = grid.Grid()
+    pos = Vector2(3, 2)
+    assert g.get_tile(pos).type == "nothing"
+    g.change_tile("player", pos, None)
+    assert g.types[2, 3] == grid.TILE_CODES["player"]
+    assert not g.walkable[2, 3]
+    assert g.get_tile(pos).type == "player"
+    g.change_tile("food", pos, None)
+    assert g.get_tile(pos).walkable
+    assert g.get_type(pos) == "food"
+
+
+def test_render_text_cache():
+    """Same text is rendered only once, fonts are initialized by the first one"""
+    pygame.font.quit()
+    first = text.render_text("12", "arialblack", 20, (0, 0, 0))
+    assert text.render_text("12", "arialblack", 20, (0, 0, 0)) is first
+    assert text.render_text("13", "arialblack", 20, (0, 0, 0)) is not first
+    assert text.get_font("arialblack", 20) is text.get_font("arialblack", 20)
+
+
+def test_free_cells():
+    """Index of empty tiles follows tile changes"""
+    g = grid.Grid()
+    assert len(g.free_cells) == GRID_SIZE * GRID_SIZE
+    g.change_tile("enemy", Vector2(1, 0), None)
+    g.change_tile("food", Vector2(2, 0), None)
+    assert len(g.free_cells) == GRID_SIZE * GRID_SIZE - 2
+    assert 1 not in g.free_cells and 2 not in g.free_cells
+    g.change_tile("nothing", Vector2(1, 0), None)
+    assert sorted(g.free_cells) == [idx for idx in range(GRID_SIZE * GRID_SIZE) if idx != 2]
+
+    # fill the board, except for one tile
+    for y in range(GRID_SIZE):
+        for x in range(GRID_SIZE):
+            if (x, y) != (4, 5):
+                g.change_tile("player", Vector2(x, y), None)
+    rng = np.random.default_rng(0)
+    assert g.random_free_cell(rng) == Vector2(4, 5)
+    g.change_tile("player", Vector2(4, 5), None)
+    assert g.random_free_cell(rng) is None
+
+
+def test_grid_copy_and_undo():
+    """Copy of the grid is independent and undo restores the board exactly, including the empty tiles index"""
+    g = grid.Grid()
+    g.change_tile("enemy", Vector2(3, 3), None, owner=1)
+    copy = g.copy()
+    copy.change_tile("player", Vector2(4, 4), None)
+    assert g.get_type(Vector2(4, 4)) == "nothing"
+
+    free_cells = list(copy.free_cells)
+    checkpoint = copy.checkpoint()
+    copy.change_tile("food", Vector2(5, 5), None)
+    copy.change_tile("nothing", Vector2(3, 3), None)
+    copy.change_tile("enemy", Vector2(0, 0), None, owner=2)
+    copy.undo(checkpoint)
+    assert copy.get_type(Vector2(3, 3)) == "enemy" and copy.get_owner(Vector2(3, 3)) == 1
+    assert copy.get_type(Vector2(0, 0)) == "nothing" and copy.get_type(Vector2(5, 5)) == "nothing"
+    assert copy.free_cells == free_cells
+    assert not copy.food_cells
+
+
+@pytest.mark.parametrize(
+    ['frames', 'speed', 'ticks'],
+    [
+        ([16] * 10, 1.0, [0, 0, 0, 0, 1, 0, 0, 0, 0, 1]),
+        ([80, 80, 80], 2.0, [2, 2, 2]),
+        ([1000, 10], 1.0, [5, 0]),
+        ([16, 16], None, [5, 5]),
+    ]
+)
+def test_scheduler(frames, speed, ticks):
+    """Test that frame time turns into the right number of ticks"""
+    s = scheduler.TickScheduler(75, 5, speed)
+    assert [s.advance(frame) for frame in frames] == ticks
+
+
+def test_snake_body():
+    """Snake body keeps cells from the tail to the head in a ring buffer"""
+    b = body.SnakeBody(capacity=4)
+    for cell in (5, 6, 7):
+        b.append(cell)
+    assert (len(b), b.tail, b.head) == (3, 5, 7)
+    assert b.popleft() == 5 and b.tail == 6
+    b.append(8)
+    b.append(9)
+    # the ring buffer wrapped around
+    assert list(b.iter_cells()) == [6, 7, 8, 9]
+    assert b[-1] == Vector2(9 % GRID_SIZE, 9 // GRID_SIZE) and b[0] == Vector2(6, 0)
+    assert b.pop() == 9
+    b.appendleft(5)
+    assert list(b.iter_cells()) == [5, 6, 7, 8]
+    b.clear()
+    assert not b and not list(b.iter_cells())
+
+
+@pytest.mark.parametrize("config", [DEFAULT_CONFIG, BoardConfig(7)])
+def test_padded_index_helpers(config):
+    """Integer versions of the helpers on padded indices agree with the Vector2 ones, on boards of any size"""
+    size = config.grid_size
+    a, b = Vector2(2, 3), Vector2(size - 1, 0)
+    pa, pb = helpers.padded_index(2, 3, config), helpers.padded_index(size - 1, 0, config)
+    assert helpers.distance_index(pa, pb, config) == helpers.distance(a, b)
+    assert config.padded_cells[3 * size + 2] == pa
+    assert config.unpadded_cells[pa] == 3 * size + 2
+    # every neighbour of a cell on the edge is a valid index, the ones outside are on the border
+    for offset in config.padded_offsets:
+        assert helpers.out_of_bounds_index(pb + offset, config) == helpers.out_of_bounds(
+            Vector2(config.padded_x[pb + offset], config.padded_y[pb + offset]), config)
+
+
+def test_batch_helpers():
+    """NumPy versions of the helpers work on whole arrays of positions"""
+    positions = np.array([[0, 0], [GRID_SIZE, 0], [5, GRID_SIZE], [GRID_SIZE - 1, 0], [-1, 3]])
+    assert helpers.out_of_bounds_batch(positions).tolist() == [False, True, True, False, True]
+    assert helpers.distance_batch(positions, [4, 10]).tolist() == [
+        helpers.distance(Vector2(x, y), Vector2(4, 10)) for x, y in positions]
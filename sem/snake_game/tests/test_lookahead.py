@@ -0,0 +1,100 @@
+"""imports"""
+import pytest
+from pygame.math import Vector2
+
+from src import lookahead
+from src.config import GRID_SIZE, board_config
+from src.engine import Engine
+from src.game_objects import EnemySnake, Food
+from src.grid import Grid
+from src.lookahead import LookaheadAI
+
+
+def pocket_board():
+    """Returns enemy snake heading up next to a dead-end pocket with food at its entrance"""
+    grid = Grid()
+    for pos in [(10, 9), (11, 9), (10, 11), (11, 11), (12, 10)]:
+        grid.change_tile("player", Vector2(pos), None)
+    food = Food(grid, None)
+    food.pos = Vector2(10, 10)
+    food.is_spawned = True
+    grid.change_tile("food", food.pos, None)
+    snake = EnemySnake(grid, None, food, start_pos=Vector2(9, 14))
+    for y in range(13, 9, -1):
+        snake.body.append(y * GRID_SIZE + 9)
+        grid.change_tile("enemy", Vector2(9, y), None, owner=1)
+    snake.direction = snake.last_direction = Vector2(0, -1)
+    return grid, snake
+
+
+def test_lookahead_avoids_dead_end():
+    """Greedy AI goes for the food in a dead end, lookahead AI doesn't and leaves the board untouched"""
+    grid, snake = pocket_board()
+    snake.steer_to_food()
+    assert snake.direction == Vector2(1, 0)
+
+    types = grid.types.copy()
+    ai = LookaheadAI(time_budget=1.0, max_depth=6)
+    assert ai.choose_direction(snake) in (Vector2(0, -1), Vector2(-1, 0))
+    assert ai.last_depth == 6
+    assert (grid.types == types).all()
+
+
+def test_lookahead_deadline():
+    """Without any time left the AI still picks a move which doesn't collide right away"""
+    grid, snake = pocket_board()
+    ai = LookaheadAI(time_budget=0.0)
+    direction = ai.choose_direction(snake)
+    assert ai.last_depth == 0
+    assert grid.is_walkable(snake.body[-1] + direction)
+
+
+def test_lookahead_engine():
+    """In whole games against the same player the enemy with the lookahead AI survives, where the greedy one loses"""
+    for seed in (0, 1, 4):
+        winners = []
+        for ai in (None, LookaheadAI(time_budget=1.0, max_depth=4)):
+            engine = Engine(seed=seed, enemy_ai=ai)
+            while not engine.is_over and engine.ticks < 400:
+                engine.player.steer_to_food()
+                engine.step()
+            winners.append(engine.winner)
+        assert winners[0] == "player" and winners[1] != "player"
+        assert ai.last_depth == 4
+
+
+class FakeClock:
+    """Stands in for time.perf_counter, every reading moves the time by a fixed step"""
+
+    def __init__(self, step):
+        self.step = step
+        self.now = 0.0
+
+    def perf_counter(self):
+        """Returns the time after one more step"""
+        self.now += self.step
+        return self.now
+
+
+def test_lookahead_deadline_large_board(monkeypatch):
+    """On a large board the AI checks the deadline often and stops at the first check after it, with a valid move"""
+    clock = FakeClock(0.001)
+    monkeypatch.setattr(lookahead, "time", clock)
+    ai = LookaheadAI(time_budget=0.005)
+    engine = Engine(seed=5, enemy_ai=ai, config=board_config(200))
+    direction = ai.choose_direction(engine.enemy)
+    assert ai.last_depth < ai.max_depth
+    assert clock.now == pytest.approx(ai.deadline + clock.step)
+    assert engine.grid.is_walkable(engine.enemy.body[-1] + direction)
+
+
+def test_lookahead_engine_avoids_dead_end():
+    """Greedy enemy follows the food into the pocket and dies there, enemy moved by the lookahead AI doesn't"""
+    survived = []
+    for ai in (None, LookaheadAI(time_budget=1.0, max_depth=6)):
+        grid, snake = pocket_board()
+        snake.ai = ai
+        alive = all(snake.move() for _ in range(3))
+        survived.append(alive)
+        assert grid.get_type(Vector2(11, 10)) == ("enemy" if ai is None else "nothing")
+    assert survived == [False, True]
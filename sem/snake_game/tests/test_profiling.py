@@ -0,0 +1,65 @@
+"""imports"""
+import csv
+import subprocess
+import sys
+
+from src.arena import Arena
+from src.benchmark import PACKAGE_DIR
+from src.engine import Engine
+from src.grid import Grid
+from src.profiling import Profiler
+
+
+def test_profiler_headless(tmp_path):
+    """Profiler measures headless game and restores the methods afterwards"""
+    original = Grid.shortest_path_cells
+    dump_path = tmp_path / "profile.csv"
+    with Profiler(dump_path, dump_interval=0) as profiler:
+        assert Grid.shortest_path_cells is not original
+        engine = Engine(seed=3)
+        for _ in range(20):
+            engine.step()
+            profiler.end_tick()
+    assert Grid.shortest_path_cells is original
+
+    assert profiler.tick_count == 20
+    summary = profiler.summary()
+    assert summary["mean"]["enemy_move"] > 0
+    assert summary["mean"]["astar_expansions"] > 0
+    with open(dump_path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "tick"
+    assert len(rows) == 21
+
+
+def test_profiler_flushes_on_uninstall(tmp_path):
+    """Ticks waiting for the next periodic dump are written when the profiler is uninstalled"""
+    dump_path = tmp_path / "profile.csv"
+    with Profiler(dump_path, dump_interval=3600) as profiler:
+        engine = Engine(seed=3)
+        for _ in range(5):
+            engine.step()
+            profiler.end_tick()
+        assert not dump_path.exists()
+    with open(dump_path, encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 6
+
+
+def test_profiler_food_field():
+    """Updates of the shared food field are measured next to A*"""
+    with Profiler() as profiler:
+        arena = Arena(4, seed=0)
+        for _ in range(10):
+            arena.step()
+            profiler.end_tick()
+    summary = profiler.summary()
+    assert summary["mean"]["food_field"] > 0
+    assert summary["mean"]["field_expansions"] > 0
+
+
+def test_profiler_import_is_lazy():
+    """Importing the profiler doesn't load the game (nor pygame), only installing it does"""
+    imports = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.profiling"], cwd=PACKAGE_DIR,
+                             check=True, capture_output=True, text=True).stderr
+    assert "src.profiling" in imports
+    assert "src.game" not in imports and "pygame" not in imports
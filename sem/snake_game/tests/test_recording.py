@@ -0,0 +1,66 @@
+"""imports"""
+import os
+
+import numpy as np
+import pytest
+from pygame.math import Vector2
+
+from src.config import GRID_SIZE, FOOD_COLOR, BACKGROUND_COLOR
+from src.grid import Grid
+from src.recording import FrameRecorder, render_frame
+
+
+def test_render_frame():
+    """Board is rendered straight from the tile codes, each tile as a square of pixels"""
+    grid = Grid()
+    grid.change_tile("food", Vector2(2, 1), None)
+    image = render_frame(grid.types, scale=3)
+    assert image.shape == (GRID_SIZE * 3, GRID_SIZE * 3, 3)
+    assert tuple(image[3, 6]) == FOOD_COLOR and tuple(image[5, 8]) == FOOD_COLOR
+    assert tuple(image[0, 0]) == BACKGROUND_COLOR
+
+
+def test_frame_recorder(tmp_path):
+    """Queued boards are written as raw stream or PPM images after the recorder is closed"""
+    grid = Grid()
+    boards = []
+    with FrameRecorder(tmp_path / "game.rgb", scale=2) as raw, \
+            FrameRecorder(tmp_path / "frames", "ppm", scale=2) as ppm:
+        for x in range(3):
+            grid.change_tile("enemy", Vector2(x, 0), None)
+            boards.append(grid.types.copy())
+            raw.add(grid.types)
+            ppm.add(grid.types)
+    frame_size = (GRID_SIZE * 2) ** 2 * 3
+    data = (tmp_path / "game.rgb").read_bytes()
+    assert len(data) == 3 * frame_size
+    # frames are copies of the board at the time they were added
+    for i, board in enumerate(boards):
+        frame = np.frombuffer(data[i * frame_size:(i + 1) * frame_size], dtype=np.uint8)
+        assert (frame == render_frame(board, 2).ravel()).all()
+
+    images = sorted((tmp_path / "frames").iterdir())
+    assert [image.name for image in images] == ["frame_000001.ppm", "frame_000002.ppm", "frame_000003.ppm"]
+    assert images[0].read_bytes().startswith(f"P6 {GRID_SIZE * 2} {GRID_SIZE * 2} 255\n".encode("ascii"))
+
+
+def test_frame_recorder_error(tmp_path):
+    """Error of the writer thread is raised in the simulation, the bounded queue doesn't block after it"""
+    grid = Grid()
+    # the raw stream can't be opened, the path is a directory
+    recorder = FrameRecorder(tmp_path, max_queued=2)
+    with pytest.raises(IsADirectoryError):
+        for _ in range(10):
+            recorder.add(grid.types)
+    with pytest.raises(IsADirectoryError):
+        recorder.close()
+
+
+@pytest.mark.skipif(not os.path.exists("/dev/full"), reason="needs a device which is always full")
+def test_frame_recorder_error_on_close():
+    """Error of flushing the last frames is raised by close, which doesn't wait for more frames"""
+    recorder = FrameRecorder("/dev/full", scale=1)
+    recorder.add(Grid().types)
+    # the frame fits into the buffer of the file, writing fails only when it's flushed after the last frame
+    with pytest.raises(OSError):
+        recorder.close()
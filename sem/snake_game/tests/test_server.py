@@ -0,0 +1,65 @@
+"""imports"""
+import asyncio
+
+from pygame.math import Vector2
+
+from src.engine import Engine
+from src.server import GameServer, LoopbackClient, encode_cells, CELL, MESSAGE, DELTA, END, FULL
+
+
+def test_server_loopback():
+    """Client rebuilds the board from the deltas and its inputs control the player"""
+    async def scenario():
+        server = GameServer(tick_interval=0.001, seed=1)
+        port = await server.start()
+        client = LoopbackClient()
+        await client.connect("127.0.0.1", port)
+        engine = server.matches[0].engine
+        assert (client.board == engine.grid.types.ravel()).all()
+
+        client.send_direction(Vector2(0, 1))
+        await asyncio.sleep(0.05)
+        await server.run(ticks=5)
+        while client.tick < 5:
+            assert await client.receive() == DELTA
+        assert engine.player.direction == Vector2(0, 1)
+        assert (client.board == engine.grid.types.ravel()).all()
+        # only the changed tiles were sent
+        assert client.received_bytes < 2 * engine.grid.types.size
+
+        # moving out of the board ends the match
+        client.send_direction(Vector2(-1, 0))
+        await asyncio.sleep(0.05)
+        server.tick()
+        assert await client.receive() == DELTA
+        assert await client.receive() == END
+        assert client.winner == "enemy"
+        assert not server.matches
+
+        await client.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_changes_log_keeps_journal():
+    """Log of changed tiles drained by the server every tick doesn't end checkpoints of the grid"""
+    engine = Engine(seed=1)
+    grid = engine.grid
+    grid.log_changes()
+    grid.drain_changes()
+    snapshot = engine.snapshot()
+    engine.step(Vector2(0, 1))
+    assert grid.config.cell_index(engine.player.body[-1]) in grid.drain_changes()
+    assert not grid.drain_changes()
+    assert grid.journal
+    engine.restore(snapshot)
+    assert engine.ticks == 0
+
+
+def test_encode_cells_large_board():
+    """Cells of boards larger than 256x256 fit into the messages"""
+    cells = list(range(300 * 300 - 70000, 300 * 300))
+    message = encode_cells(FULL, 1, cells, [1] * 300 * 300)
+    assert MESSAGE.unpack_from(message) == (FULL, 1, len(cells))
+    assert list(CELL.iter_unpack(message[MESSAGE.size:]))[-1] == (300 * 300 - 1, 1)
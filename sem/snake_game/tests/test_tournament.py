@@ -0,0 +1,78 @@
+"""imports"""
+import importlib.util
+import json
+import os
+
+from src.benchmark import PACKAGE_DIR
+from src.tournament import run_tournament, schedule_matches
+
+
+def test_tournament(tmp_path):
+    """Every match of the tournament ends up in the results file"""
+    out_path = tmp_path / "results.jsonl"
+    summary = run_tournament(3, out_path, workers=1, seed=1, max_ticks=2000)
+    assert summary["games"] == 3
+    assert summary["player"] + summary["enemy"] + summary["draw"] == 3
+    assert summary["failed"] == 0
+
+    with open(out_path, encoding="utf-8") as f:
+        results = [json.loads(line) for line in f]
+    assert len(results) == 3
+    assert len({r["seed"] for r in results}) == 3
+    for r in results:
+        assert r["winner"] in ("player", "enemy", None)
+        assert r["ticks"] <= 2000
+        assert r["ai"] == "greedy"
+
+
+def test_tournament_mixed_sizes(tmp_path):
+    """Matches of one tournament take turns in board sizes"""
+    run_tournament(4, tmp_path / "results.jsonl", workers=2, seed=3, grid_size=(10, 30), max_ticks=500)
+    with open(tmp_path / "results.jsonl", encoding="utf-8") as f:
+        sizes = sorted(json.loads(line)["grid_size"] for line in f)
+    assert sizes == [10, 10, 30, 30]
+
+
+def test_tournament_frames(tmp_path):
+    """Every tick of recorded matches ends up in their frame stream"""
+    run_tournament(2, tmp_path / "results.jsonl", workers=1, seed=2, max_ticks=50, frames=(tmp_path, "raw", 1))
+    with open(tmp_path / "results.jsonl", encoding="utf-8") as f:
+        results = [json.loads(line) for line in f]
+    for r in results:
+        frames = (tmp_path / f"{r['seed']}.rgb").stat().st_size // (r["grid_size"] ** 2 * 3)
+        assert frames == r["ticks"] + 1
+
+
+def test_tournament_frames_error(tmp_path):
+    """Match whose frames can't be written fails with the error in its results, the others go on"""
+    # the stream of the first match can't be created, there is a directory of the same name
+    matches = schedule_matches(2, 4, 10)
+    (tmp_path / f"{matches[0][0]}.rgb").mkdir()
+    out_path = tmp_path / "results.jsonl"
+    summary = run_tournament(2, out_path, workers=1, seed=4, grid_size=10, max_ticks=50, frames=(tmp_path, "raw", 1))
+    assert summary["failed"] == 1
+    with open(out_path, encoding="utf-8") as f:
+        errors = {r["seed"]: r["error"] for r in map(json.loads, f)}
+    assert errors[matches[0][0]] and errors[matches[1][0]] is None
+
+
+def test_cli_grid_size():
+    """Board size can be given before or after the command, the command doesn't reset it"""
+    spec = importlib.util.spec_from_file_location("snake_game_cli", os.path.join(PACKAGE_DIR, "__main__.py"))
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+    assert cli.parse_args(["--grid-size", "30", "tournament"]).grid_size == 30
+    assert cli.parse_args(["tournament", "--grid-size", "30", "40"]).grid_size == [30, 40]
+    assert cli.parse_args(["--grid-size", "30", "serve"]).grid_size == 30
+    assert cli.parse_args(["serve"]).grid_size is None
+    assert cli.parse_args(["--ai", "lookahead", "tournament"]).ai == "lookahead"
+    assert cli.parse_args(["tournament", "--ai", "greedy", "lookahead"]).ai == ["greedy", "lookahead"]
+
+
+def test_tournament_enemy_ais(tmp_path):
+    """Matches take turns in the AIs of the enemy, results are summed up per AI"""
+    out_path = tmp_path / "results.jsonl"
+    summary = run_tournament(4, out_path, workers=2, seed=5, grid_size=10, ai=("greedy", "lookahead"), max_ticks=200)
+    assert {name: results["games"] for name, results in summary["ai"].items()} == {"greedy": 2, "lookahead": 2}
+    with open(out_path, encoding="utf-8") as f:
+        assert sorted(json.loads(line)["ai"] for line in f) == ["greedy", "greedy", "lookahead", "lookahead"]